@@ -1,13 +1,16 @@
 """Agent invocation — API client, single-shot calls, streaming, response parsing."""
 
-import json
+import hashlib
 import os
+import random
+import re
 import time
-from collections.abc import Generator
-from typing import Any
+from collections.abc import Callable, Generator
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any
 
-import anthropic
-from dotenv import load_dotenv
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json, to_json
 from rich.console import Console
 
 from nova.config import ModelConfig
@@ -20,19 +23,42 @@ from nova.models import (
     PlannerOutput,
     QAOutput,
 )
+from nova.paths import RESPONSE_CACHE_DIR
+
+if TYPE_CHECKING:
+    import anthropic
 
-load_dotenv()
 console = Console()
 
 MAX_RETRIES = 3
 RETRY_BACKOFF_BASE = 2  # seconds
+RETRY_JITTER = 0.25  # up to +25% of the backoff, so parallel agents don't retry in lockstep
+
+# Stream coalescing: the batch starts small so the first tokens show up
+# immediately, then grows geometrically up to DEFAULT_BATCH_SIZE chars.
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MIN_BATCH_SIZE = 1
+DEFAULT_BATCH_SIZE_GROWTH_FACTOR = 3
+STREAM_FLUSH_INTERVAL = 0.02  # seconds
 
 
 # ---------------------------------------------------------------------------
 # Client
 # ---------------------------------------------------------------------------
 
-def get_client() -> anthropic.Anthropic:
+@lru_cache(maxsize=1)
+def get_client() -> "anthropic.Anthropic":
+    """Return the process-wide Anthropic client.
+
+    The client is built once and reused so its HTTP connection pool stays
+    warm across agent calls. A missing key raises and is not cached.
+    """
+    # anthropic and dotenv are imported here so commands that never call
+    # the API (status, --version, ...) don't pay for them at startup.
+    import anthropic
+    from dotenv import load_dotenv
+
+    load_dotenv()
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key or api_key == "your-key-here":
         raise RuntimeError(
@@ -41,6 +67,99 @@ def get_client() -> anthropic.Anthropic:
     return anthropic.Anthropic(api_key=api_key)
 
 
+def _backoff(attempt: int) -> float:
+    """Return the jittered wait before retry number attempt + 1."""
+    wait = RETRY_BACKOFF_BASE << attempt
+    return wait + random.uniform(0, wait * RETRY_JITTER)
+
+
+def _sleep(seconds: float) -> None:
+    """Sleep until a monotonic deadline, so wall-clock adjustments can't skew it."""
+    deadline = time.monotonic() + seconds
+    while (remaining := deadline - time.monotonic()) > 0:
+        time.sleep(remaining)
+
+
+# ---------------------------------------------------------------------------
+# Prompt caching
+# ---------------------------------------------------------------------------
+
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+def _cached_system(system_prompt: str) -> str | list[dict[str, Any]]:
+    """The system prompt as one text block marked for prompt caching.
+
+    Retries, QA rounds and every chat turn resend the same system prompt,
+    so later calls read it from the cache instead of paying for it again.
+    Prompts under the model's minimum cacheable length are simply not cached.
+    """
+    if not system_prompt:
+        return system_prompt
+    return [{"type": "text", "text": system_prompt, "cache_control": _EPHEMERAL}]
+
+
+def _with_cache_breakpoint(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Copy of messages with the last one marked as a cache breakpoint.
+
+    The next chat turn then reuses the cached conversation up to here and
+    only pays full price for the new messages. The caller's list isn't
+    modified, so sessions are still saved as plain strings.
+    """
+    if not messages:
+        return messages
+    last = messages[-1]
+    content = last.get("content")
+    if not content or not isinstance(content, str):
+        return messages
+    block = {"type": "text", "text": content, "cache_control": _EPHEMERAL}
+    return [*messages[:-1], {**last, "content": [block]}]
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+# Opt-in exact-match cache of model responses, for re-running a pipeline
+# step (e.g. the Distiller) against unchanged inputs without paying for the
+# call again. Set NOVA_RESPONSE_CACHE=1 (in the environment or .env).
+RESPONSE_CACHE_ENV = "NOVA_RESPONSE_CACHE"
+
+
+def _response_cache_key(
+    role: AgentRole,
+    model_config: ModelConfig,
+    system_prompt: str,
+    messages: list[dict[str, Any]],
+) -> str | None:
+    """Cache key for a request, or None when the response cache is off."""
+    if os.getenv(RESPONSE_CACHE_ENV, "").lower() not in ("1", "true", "yes", "on"):
+        return None
+    payload = to_json([role.value, model_config.model_dump(), system_prompt, messages])
+    return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+
+def _cache_get(key: str, model: str) -> tuple[str, dict[str, Any]] | None:
+    """Cached response text, with zero usage since no tokens were spent."""
+    try:
+        with open(RESPONSE_CACHE_DIR / f"{key}.json", "rb") as f:
+            text = from_json(f.read())["text"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return text, {"input_tokens": 0, "output_tokens": 0, "model": model, "response_cache": True}
+
+
+def _cache_put(key: str, text: str) -> None:
+    path = RESPONSE_CACHE_DIR / f"{key}.json"
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        RESPONSE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(to_json({"text": text}))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # only a cache
+
+
 # ---------------------------------------------------------------------------
 # Response parsing
 # ---------------------------------------------------------------------------
@@ -53,49 +172,96 @@ ROLE_OUTPUT_MAP: dict[AgentRole, type[AgentOutput]] = {
 }
 
 
+_JSON_FENCE_RE = re.compile(r"```json[^\n]*\n(.*?)```", re.DOTALL)
+_ANY_FENCE_RE = re.compile(r"```[^\n]*\n(.*?)```", re.DOTALL)
+_LEADING_WS_RE = re.compile(r"\s*")
+
+
 def _extract_json(text: str) -> dict[str, Any]:
     """Extract a JSON object from model response text.
 
-    Handles both raw JSON and JSON inside a ```json code fence.
+    Handles both raw JSON and JSON inside a ```json code fence. Parsing goes
+    through pydantic-core's Rust JSON parser; malformed JSON raises ValueError.
     """
-    stripped = text.strip()
-
-    if stripped.startswith("{"):
-        return json.loads(stripped)
-
-    start = stripped.find("```json")
-    if start != -1:
-        start = stripped.index("\n", start) + 1
-        end = stripped.find("```", start)
-        if end != -1:
-            return json.loads(stripped[start:end].strip())
-
-    start = stripped.find("```")
-    if start != -1:
-        start = stripped.index("\n", start) + 1
-        end = stripped.find("```", start)
-        if end != -1:
-            candidate = stripped[start:end].strip()
-            if candidate.startswith("{"):
-                return json.loads(candidate)
-
-    start = stripped.find("{")
-    end = stripped.rfind("}") + 1
-    if start != -1 and end > start:
-        return json.loads(stripped[start:end])
+    # Sniff the first non-whitespace char instead of strip()-ing a copy of
+    # the whole response; JSON itself tolerates the surrounding whitespace.
+    start = _LEADING_WS_RE.match(text).end()
+    if text.startswith("{", start):
+        return from_json(text)
+
+    match = _JSON_FENCE_RE.search(text, start)
+    if match:
+        return from_json(match.group(1).strip())
+
+    match = _ANY_FENCE_RE.search(text, start)
+    if match:
+        candidate = match.group(1).strip()
+        if candidate.startswith("{"):
+            return from_json(candidate)
+
+    first = text.find("{", start)
+    last = text.rfind("}")
+    if first != -1 and last > first:
+        return from_json(text[first:last + 1])
 
     raise ValueError("No JSON object found in response")
 
 
-def parse_agent_response(role: AgentRole, raw_response: str) -> AgentOutput:
-    """Parse raw model response into the correct typed output model."""
-    output_class = ROLE_OUTPUT_MAP[role]
+def _message_text(message: Any) -> str:
+    """Concatenate the text blocks of an API message, ignoring any other block types."""
+    return "".join(block.text for block in message.content if block.type == "text")
+
+
+def _usage_meta(message: Any, model: str) -> dict[str, Any]:
+    """Token usage for an API message, in the shape run logs expect."""
+    usage = message.usage
+    return {"input_tokens": usage.input_tokens, "output_tokens": usage.output_tokens, "model": model}
+
+
+# One TypeAdapter per output model, built once at import.
+_ROLE_ADAPTERS: dict[AgentRole, TypeAdapter[AgentOutput]] = {
+    role: TypeAdapter(output_class) for role, output_class in ROLE_OUTPUT_MAP.items()
+}
+
+
+def _parse_for_role(
+    raw_response: str,
+    *,
+    role_str: str,
+    validate: Callable[[Any], AgentOutput],
+    validate_json: Callable[[str], AgentOutput],
+) -> AgentOutput:
+    # Happy path: a bare JSON object that already names its role is
+    # validated straight from the string, with no intermediate dict. Any
+    # failure falls through to the tolerant path below, which re-raises
+    # genuine schema errors.
+    start = _LEADING_WS_RE.match(raw_response).end()
+    if raw_response.startswith("{", start) and '"role"' in raw_response:
+        try:
+            return validate_json(raw_response)
+        except ValidationError:
+            pass
+
     data = _extract_json(raw_response)
+    data.setdefault("role", role_str)
+    return validate(data)
+
+
+# One pre-bound parser per role, so each parse is a single dict lookup.
+_PARSERS: dict[AgentRole, Callable[[str], AgentOutput]] = {
+    role: partial(
+        _parse_for_role,
+        role_str=role.value,
+        validate=adapter.validate_python,
+        validate_json=adapter.validate_json,
+    )
+    for role, adapter in _ROLE_ADAPTERS.items()
+}
 
-    if "role" not in data:
-        data["role"] = role.value
 
-    return output_class.model_validate(data)
+def parse_agent_response(role: AgentRole, raw_response: str) -> AgentOutput:
+    """Parse raw model response into the correct typed output model."""
+    return _PARSERS[role](raw_response)
 
 
 # ---------------------------------------------------------------------------
@@ -111,33 +277,54 @@ def call_agent_single_shot(
     """Make a single API call and return parsed output + usage metadata.
 
     Retries on API errors with exponential backoff.
-    On malformed response, retries once asking for valid JSON.
+    On malformed JSON, retries once asking for valid JSON; JSON that fails
+    schema validation is returned as blocked without a retry.
     Returns a blocked AgentOutput if all retries fail.
     """
+    import anthropic
+
     client = get_client()
     raw_response = ""
     usage_meta: dict[str, Any] = {}
 
+    cache_key = _response_cache_key(
+        role, model_config, system_prompt, [{"role": "user", "content": user_message}]
+    )
+    if cache_key and (cached := _cache_get(cache_key, model_config.model)):
+        try:
+            return parse_agent_response(role, cached[0]), cached[1]
+        except ValueError:
+            pass  # stale or hand-edited entry; make the call
+
     for attempt in range(MAX_RETRIES):
         try:
             message = client.messages.create(
                 model=model_config.model,
                 max_tokens=model_config.max_tokens,
                 temperature=model_config.temperature,
-                system=system_prompt,
+                system=_cached_system(system_prompt),
                 messages=[{"role": "user", "content": user_message}],
             )
 
-            raw_response = message.content[0].text
-            usage_meta = {
-                "input_tokens": message.usage.input_tokens,
-                "output_tokens": message.usage.output_tokens,
-                "model": model_config.model,
-            }
-
-            return parse_agent_response(role, raw_response), usage_meta
-
-        except (json.JSONDecodeError, ValueError):
+            raw_response = _message_text(message)
+            usage_meta = _usage_meta(message, model_config.model)
+
+            output = parse_agent_response(role, raw_response)
+            if cache_key:
+                _cache_put(cache_key, raw_response)
+            return output, usage_meta
+
+        except ValidationError as e:
+            # Well-formed JSON with the wrong shape: asking again for "just
+            # the JSON" won't fix it, so don't pay for another call.
+            return ROLE_OUTPUT_MAP[role](
+                role=role,
+                status=AgentStatus.BLOCKED,
+                summary=f"Response failed schema validation: {e}",
+                next_action="escalate",
+            ), usage_meta
+
+        except ValueError:
             if attempt == 0:
                 user_message = (
                     "Your previous response was not valid JSON. "
@@ -160,9 +347,9 @@ def call_agent_single_shot(
                 break
 
             if attempt < MAX_RETRIES - 1:
-                wait = RETRY_BACKOFF_BASE ** (attempt + 1)
-                console.print(f"[yellow]API error (attempt {attempt + 1}): {e}. Retrying in {wait}s...[/yellow]")
-                time.sleep(wait)
+                wait = _backoff(attempt)
+                console.print(f"[yellow]API error (attempt {attempt + 1}): {e}. Retrying in {wait:.1f}s...[/yellow]")
+                _sleep(wait)
                 continue
             console.print(f"[red]API error after {MAX_RETRIES} attempts: {e}[/red]")
             break
@@ -185,8 +372,16 @@ def call_agent_stream(
     system_prompt: str,
     model_config: ModelConfig,
     messages: list[dict[str, str]],
+    max_batch_size: int = DEFAULT_BATCH_SIZE,
+    min_batch_size: int = DEFAULT_MIN_BATCH_SIZE,
+    batch_growth_factor: int = DEFAULT_BATCH_SIZE_GROWTH_FACTOR,
 ) -> Generator[str, None, tuple[str, dict[str, Any]]]:
-    """Stream a response token-by-token. Yields text chunks as they arrive.
+    """Stream a response in coalesced batches. Yields text chunks as they arrive.
+
+    Deltas are buffered and yielded once the batch reaches the current size
+    limit or STREAM_FLUSH_INTERVAL has passed. The limit starts at
+    min_batch_size and grows by batch_growth_factor per yield, up to
+    max_batch_size.
 
     After the stream completes, returns (full_response, usage_meta) via StopIteration.
     The caller uses this in a for loop to display streaming text,
@@ -194,40 +389,62 @@ def call_agent_stream(
 
     Usage:
         gen = call_agent_stream(role, prompt, config, messages)
-        full = ""
         try:
             while True:
                 chunk = next(gen)
                 print(chunk, end="", flush=True)
-                full += chunk
         except StopIteration as e:
             full_response, usage_meta = e.value
     """
+    import anthropic
+
     client = get_client()
 
+    cache_key = _response_cache_key(role, model_config, system_prompt, messages)
+    if cache_key and (cached := _cache_get(cache_key, model_config.model)):
+        yield cached[0]
+        return cached
+
     for attempt in range(MAX_RETRIES):
         try:
-            full_response = ""
+            parts: list[str] = []
             usage_meta: dict[str, Any] = {}
 
             with client.messages.stream(
                 model=model_config.model,
                 max_tokens=model_config.max_tokens,
                 temperature=model_config.temperature,
-                system=system_prompt,
-                messages=messages,
+                system=_cached_system(system_prompt),
+                messages=_with_cache_breakpoint(messages),
             ) as stream:
-                for text in stream.text_stream:
-                    full_response += text
-                    yield text
-
-                final = stream.get_final_message()
-                usage_meta = {
-                    "input_tokens": final.usage.input_tokens,
-                    "output_tokens": final.usage.output_tokens,
-                    "model": model_config.model,
-                }
+                buf: list[str] = []
+                buf_len = 0
+                batch_size = min_batch_size
+                last_flush = time.monotonic()
 
+                for text in stream.text_stream:
+                    buf.append(text)
+                    buf_len += len(text)
+                    now = time.monotonic()
+                    if buf_len >= batch_size or now - last_flush >= STREAM_FLUSH_INTERVAL:
+                        batch = "".join(buf)
+                        parts.append(batch)
+                        yield batch
+                        buf.clear()
+                        buf_len = 0
+                        batch_size = min(batch_size * batch_growth_factor, max_batch_size)
+                        last_flush = now
+
+                if buf:
+                    batch = "".join(buf)
+                    parts.append(batch)
+                    yield batch
+
+                usage_meta = _usage_meta(stream.get_final_message(), model_config.model)
+
+            full_response = "".join(parts)
+            if cache_key:
+                _cache_put(cache_key, full_response)
             return full_response, usage_meta
 
         except anthropic.APIError as e:
@@ -243,8 +460,8 @@ def call_agent_stream(
                 raise
 
             if attempt < MAX_RETRIES - 1:
-                wait = RETRY_BACKOFF_BASE ** (attempt + 1)
-                console.print(f"\n[yellow]API error (attempt {attempt + 1}): {e}. Retrying in {wait}s...[/yellow]")
-                time.sleep(wait)
+                wait = _backoff(attempt)
+                console.print(f"\n[yellow]API error (attempt {attempt + 1}): {e}. Retrying in {wait:.1f}s...[/yellow]")
+                _sleep(wait)
                 continue
             raise
@@ -1,21 +1,22 @@
 """Nova CLI — entry point for all commands."""
 
+import os
 import subprocess
 from functools import partial
+from operator import attrgetter
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import typer
 from rich.console import Console
-from rich.tree import Tree
 
 from nova.config import load_models_config, merge_preferences
 from nova.models import AgentRole, ProjectPhase, TaskState
 from nova.paths import PROJECTS_DIR, get_project_docs, get_project_logs, get_project_preferences, get_project_root
-from nova.prompt import compose_system_prompt
-from nova.runner import run_pipeline, run_task as runner_run_task
-from nova.session import run_chat_session
 from nova.state import get_task, init_state, load_state, save_state, transition_phase, transition_task
-from nova.transitions import handle_transition
+
+if TYPE_CHECKING:
+    from rich.tree import Tree
 
 app = typer.Typer(
     name="nova",
@@ -36,6 +37,14 @@ PROJECT_DIRS = [
     "code",
 ]
 
+# Every directory under the project root, parents before children, so each
+# one is a single mkdir with no existence checks.
+_PROJECT_DIR_TREE = sorted({
+    "/".join(parts[:i])
+    for parts in (d.split("/") for d in PROJECT_DIRS)
+    for i in range(1, len(parts) + 1)
+})
+
 STARTER_PREFERENCES = """\
 # Project Preferences — {project_name}
 # These override framework_preferences.yaml (deep merge, project wins).
@@ -69,8 +78,10 @@ def new( project_name: str = typer.Argument(..., help="Name of the new project."
 
     PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    for dir_path in PROJECT_DIRS:
-        (project_root / dir_path).mkdir(parents=True, exist_ok=True)
+    root = os.fspath(project_root)
+    os.mkdir(root)
+    for dir_path in _PROJECT_DIR_TREE:
+        os.mkdir(os.path.join(root, dir_path))
 
     prefs_file = project_root / "preferences.yaml"
     prefs_file.write_text(STARTER_PREFERENCES.format(project_name=project_name))
@@ -91,12 +102,17 @@ def new( project_name: str = typer.Argument(..., help="Name of the new project."
 
 def _load_artifact(project_name: str, *path_parts: str) -> str:
     """Load a text artifact from the project docs directory. Returns empty string if missing."""
-    path = get_project_docs(project_name)
-    for part in path_parts:
-        path = path / part
-    if path.exists():
-        return path.read_text()
-    return ""
+    path = os.path.join(get_project_docs(project_name), *path_parts)
+    try:
+        with open(path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+def _load_preferences(project_name: str) -> dict[str, Any]:
+    """Framework preferences merged with the project's own overrides."""
+    return merge_preferences(project_path=get_project_preferences(project_name))
 
 
 def _start_session(
@@ -107,12 +123,14 @@ def _start_session(
     initial_message: str | None = None,
 ) -> None:
     """Common setup for all interactive session commands."""
+    from nova.prompt import compose_system_prompt
+    from nova.session import run_chat_session
+    from nova.transitions import handle_transition
+
     state = load_state(project_name)
     models = load_models_config()
     planner_config = models.roles["planner"]
-    preferences = merge_preferences(
-        project_path=get_project_preferences(project_name),
-    )
+    preferences = _load_preferences(project_name)
     logs_dir = get_project_logs(project_name)
 
     system_prompt = compose_system_prompt(
@@ -299,6 +317,8 @@ def run_project(
     version: str = typer.Option("v1", "--version", help="Version."),
 ) -> None:
     """Run the pipeline — execute tasks through Coder → Lint/Build → QA."""
+    from nova.runner import run_pipeline
+
     state = load_state(project_name)
 
     valid_phases = (ProjectPhase.TASKS_GENERATED, ProjectPhase.EXECUTING)
@@ -317,9 +337,7 @@ def run_project(
         save_state(state)
 
     models = load_models_config()
-    preferences = merge_preferences(
-        project_path=get_project_preferences(project_name),
-    )
+    preferences = _load_preferences(project_name)
 
     run_pipeline(state, models, preferences)
 
@@ -330,6 +348,8 @@ def task_run(
     task_id: str = typer.Argument(..., help="Task ID to run (e.g., v1-001)."),
 ) -> None:
     """Run a single task by ID."""
+    from nova.runner import run_task as runner_run_task
+
     state = load_state(project_name)
 
     if state.phase not in (ProjectPhase.TASKS_GENERATED, ProjectPhase.EXECUTING):
@@ -351,14 +371,11 @@ def task_run(
         raise typer.Exit(code=1)
 
     if task.state == TaskState.BLOCKED:
-        from nova.state import transition_task as tt
-        tt(task, TaskState.READY)
+        transition_task(task, TaskState.READY)
         save_state(state)
 
     models = load_models_config()
-    preferences = merge_preferences(
-        project_path=get_project_preferences(project_name),
-    )
+    preferences = _load_preferences(project_name)
 
     runner_run_task(task, state, models, preferences)
 
@@ -405,7 +422,7 @@ def status(
 
     done_count = 0
     blocked_count = 0
-    for t in sorted(state.tasks, key=lambda t: t.order):
+    for t in sorted(state.tasks, key=attrgetter("order")):
         color = state_colors.get(t.state, "white")
         table.add_row(
             t.id,
@@ -429,7 +446,7 @@ def status(
 
     if state.escalations:
         console.print(f"\n  Escalations: {len(state.escalations)} "
-                      f"({sum(1 for e in state.escalations if e.resolved)} resolved)")
+                      f"({sum(e.resolved for e in state.escalations)} resolved)")
 
 
 @app.command("distill")
@@ -447,9 +464,7 @@ def distill_project(
         raise typer.Exit(code=1)
 
     models = load_models_config()
-    preferences = merge_preferences(
-        project_path=get_project_preferences(project_name),
-    )
+    preferences = _load_preferences(project_name)
 
     run_distiller(state, models, preferences)
 
@@ -471,22 +486,31 @@ def _git_init(project_root: Path) -> None:
 
 
 def _print_tree(project_name: str, project_root: Path) -> None:
+    from rich.tree import Tree
+
     tree = Tree(f"[bold]{project_name}/[/bold]")
     _add_to_tree(tree, project_root, project_root)
     console.print()
     console.print(tree)
 
 
-def _add_to_tree(tree: Tree, directory: Path, root: Path) -> None:
-    entries = sorted(directory.iterdir(), key=lambda p: (p.is_file(), p.name))
-    for entry in entries:
-        if entry.name.startswith("."):
-            continue
-        if entry.is_dir():
-            branch = tree.add(f"[bold]{entry.name}/[/bold]")
-            _add_to_tree(branch, entry, root)
-        else:
-            tree.add(entry.name)
+def _add_to_tree(tree: "Tree", directory: Path, root: Path) -> None:
+    # Walk with an explicit stack and os.scandir: DirEntry caches the file
+    # type from the directory read, so no per-entry stat or Path objects.
+    stack: list[tuple["Tree", str]] = [(tree, os.fspath(directory))]
+    while stack:
+        node, path = stack.pop()
+        with os.scandir(path) as it:
+            entries = sorted(
+                (not e.is_dir(follow_symlinks=False), e.name, e.path)
+                for e in it
+                if not e.name.startswith(".")
+            )
+        for is_file, name, entry_path in entries:
+            if is_file:
+                node.add(name)
+            else:
+                stack.append((node.add(f"[bold]{name}/[/bold]"), entry_path))
 
 
 if __name__ == "__main__":
@@ -1,11 +1,15 @@
-"""Configuration loading and management."""
+"""Configuration loading and management.
 
-import json
-import copy
+JSON configs are parsed and validated with model_validate_json, and YAML
+preferences parsed, once per (path, mtime, size); later loads return the
+cached result, so validation is never skipped, only not repeated.
+"""
+
+import os
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
-import yaml
 from pydantic import BaseModel, Field
 
 from nova.paths import MODELS_CONFIG, PIPELINES_DIR, FRAMEWORK_PREFERENCES
@@ -38,48 +42,203 @@ class PipelineConfig(BaseModel):
     steps: list[PipelineStep]
 
 
+# ---------------------------------------------------------------------------
+# Load cache
+# ---------------------------------------------------------------------------
+
+# Parsed results keyed by (kind, *paths) -> (file signatures, value), where a
+# signature is (st_mtime_ns, st_size). Cached values are shared between
+# callers and must be treated as read-only; they are plain dicts/models rather
+# than read-only proxies because callers type-check them with isinstance.
+_LOAD_CACHE: dict[tuple[str, ...], tuple[tuple, Any]] = {}
+
+
+# String forms of the default paths, so the hot loaders stat/open them
+# without building Path objects on every call.
+_MODELS_CONFIG_STR = os.fspath(MODELS_CONFIG)
+_PIPELINES_DIR_STR = os.path.join(PIPELINES_DIR, "")
+_FRAMEWORK_PREFERENCES_STR = os.fspath(FRAMEWORK_PREFERENCES)
+
+
+def _file_signature(path: str | Path | None) -> tuple[int, int] | None:
+    """Return (mtime_ns, size) for a file, or None if it doesn't exist."""
+    if path is None:
+        return None
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_cached(
+    kind: str,
+    path: str | Path,
+    sig: tuple[int, int],
+    parse: Callable[[str | Path], Any],
+) -> Any:
+    """Return parse(path), reusing the last result while the file signature is unchanged."""
+    key = (kind, os.fspath(path))
+    cached = _LOAD_CACHE.get(key)
+    if cached and cached[0] == sig:
+        return cached[1]
+    value = parse(path)
+    _LOAD_CACHE[key] = (sig, value)
+    return value
+
+
+def _read_text(path: str | Path) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+def _read_bytes(path: str | Path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _parse_models_config(path: str | Path) -> ModelsConfig:
+    # Validate straight from the raw bytes: pydantic-core parses the JSON
+    # itself, with no str decode or intermediate dict.
+    return ModelsConfig.model_validate_json(_read_bytes(path))
+
+
+def _parse_pipeline_config(path: str | Path) -> PipelineConfig:
+    return PipelineConfig.model_validate_json(_read_bytes(path))
+
+
+def _parse_preferences(path: str | Path) -> dict[str, Any]:
+    # yaml is only needed here, so commands that never read preferences
+    # don't pay for importing it. The C loader is used when libyaml is present.
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    prefs = yaml.load(_read_text(path), Loader=loader) or {}
+    _index_must_keys(prefs)
+    return prefs
+
+
 # ---------------------------------------------------------------------------
 # Loaders
 # ---------------------------------------------------------------------------
 
-def load_models_config(path: Path | None = None) -> ModelsConfig:
-    path = path or MODELS_CONFIG
-    if not path.exists():
+def load_models_config(path: str | Path | None = None) -> ModelsConfig:
+    path = path or _MODELS_CONFIG_STR
+    sig = _file_signature(path)
+    if sig is None:
         raise FileNotFoundError(f"Models config not found: {path}")
-    data = json.loads(path.read_text())
-    return ModelsConfig.model_validate(data)
+    return _load_cached("models", path, sig, _parse_models_config)
 
 
-def load_pipeline_config(name: str = "full", path: Path | None = None) -> PipelineConfig:
-    path = path or (PIPELINES_DIR / f"{name}.json")
-    if not path.exists():
+def load_pipeline_config(name: str = "full", path: str | Path | None = None) -> PipelineConfig:
+    path = path or f"{_PIPELINES_DIR_STR}{name}.json"
+    sig = _file_signature(path)
+    if sig is None:
         raise FileNotFoundError(f"Pipeline config not found: {path}")
-    data = json.loads(path.read_text())
-    return PipelineConfig.model_validate(data)
+    return _load_cached("pipeline", path, sig, _parse_pipeline_config)
 
 
-def load_preferences(path: Path) -> dict[str, Any]:
-    if not path.exists():
+def load_preferences(path: str | Path) -> dict[str, Any]:
+    sig = _file_signature(path)
+    if sig is None:
         return {}
-    return yaml.safe_load(path.read_text()) or {}
+    stale = _LOAD_CACHE.get(("preferences", os.fspath(path)))
+    prefs = _load_cached("preferences", path, sig, _parse_preferences)
+    if stale and stale[1] is not prefs:
+        _drop_must_keys(stale[1])
+    return prefs
 
 
 # ---------------------------------------------------------------------------
 # Preference merge
 # ---------------------------------------------------------------------------
 
-def _deep_merge(base: dict, override: dict) -> dict:
+# Framework preferences whose key starts with this can't be overridden by a project.
+MUST_PREFIX = "must_"
+
+# id(dict) -> (dict, its must_* keys) for every dict in a loaded preferences
+# tree, so conflict checks intersect key sets instead of testing each key's
+# prefix. The dict is kept in the entry so its id can't be reused while indexed.
+_MUST_KEYS: dict[int, tuple[dict, frozenset[str]]] = {}
+
+
+def _scan_must_keys(d: dict) -> frozenset[str]:
+    return frozenset(k for k in d if type(k) is str and k.startswith(MUST_PREFIX))
+
+
+def _index_must_keys(tree: Any) -> None:
+    """Index tree and every dict nested in it outside a must_* value."""
+    stack = [tree] if type(tree) is dict else []
+    while stack:
+        d = stack.pop()
+        must = _scan_must_keys(d)
+        _MUST_KEYS[id(d)] = (d, must)
+        stack.extend(v for k, v in d.items() if type(v) is dict and k not in must)
+
+
+def _drop_must_keys(tree: Any) -> None:
+    stack = [tree] if type(tree) is dict else []
+    while stack:
+        d = stack.pop()
+        entry = _MUST_KEYS.pop(id(d), None)
+        must = entry[1] if entry else frozenset()
+        stack.extend(v for k, v in d.items() if type(v) is dict and k not in must)
+
+
+def _must_keys(d: dict) -> frozenset[str]:
+    """The must_* keys of d, from the load-time index when d came from a file."""
+    entry = _MUST_KEYS.get(id(d))
+    if entry is not None and entry[0] is d:
+        return entry[1]
+    return _scan_must_keys(d)
+
+
+def _clone(value: Any) -> Any:
+    """Copy a parsed YAML/JSON value. Scalars are immutable and returned as-is."""
+    t = type(value)
+    if t is dict:
+        return {k: _clone(v) for k, v in value.items()}
+    if t is list:
+        return [_clone(v) for v in value]
+    return value
+
+
+def _deep_merge(
+    base: dict,
+    override: dict,
+    conflicts: list[str] | None = None,
+    prefix: str = "",
+) -> dict:
     """Deep merge override into base. Override wins for scalar values.
 
-    Keys prefixed with must_ in base that conflict with override
-    are collected and returned separately for human resolution.
+    If a conflicts list is given, keys prefixed with must_ in base that
+    conflict with override are collected into it (as dotted paths) for human
+    resolution, in the same pass as the merge.
     """
-    result = copy.deepcopy(base)
-    for key, value in override.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = _deep_merge(result[key], value)
+    must: frozenset[str] = frozenset()
+    if conflicts is not None:
+        must = _must_keys(base)
+        # Only must_* keys the project also sets can conflict. Sorted so the
+        # error lists them the same way on every run.
+        for key in sorted(must & override.keys()):
+            if _overrides_must(base[key], override[key]):
+                conflicts.append(f"{prefix}.{key}" if prefix else key)
+    result: dict = {}
+    for key, value in base.items():
+        if key not in override:
+            result[key] = _clone(value)
+            continue
+        other = override[key]
+        # find_must_conflicts doesn't look inside must_* values
+        nested = None if key in must else conflicts
+        if isinstance(value, dict) and isinstance(other, dict):
+            full_key = f"{prefix}.{key}" if prefix else key
+            result[key] = _deep_merge(value, other, nested, full_key)
         else:
-            result[key] = copy.deepcopy(value)
+            result[key] = _clone(other)
+    for key, value in override.items():
+        if key not in base:
+            result[key] = _clone(value)
     return result
 
 
@@ -95,38 +254,67 @@ def get_pref_value(value: Any) -> Any:
     return value
 
 
+def _overrides_must(value: Any, other: Any) -> bool:
+    """Whether other, set for a must_* key, changes the framework's value."""
+    return get_pref_value(other) != get_pref_value(value)
+
+
 def find_must_conflicts(base: dict, override: dict, prefix: str = "") -> list[str]:
-    """Find must_* keys in base that are overridden by project preferences."""
+    """Find must_* keys in base that are overridden by project preferences.
+
+    merge_preferences gets the same conflicts from its merge walk; this is for
+    callers that only want the check, so it walks without building a tree.
+    """
     conflicts: list[str] = []
-    for key, value in base.items():
-        full_key = f"{prefix}.{key}" if prefix else key
-        if key.startswith("must_") and key in override:
-            base_val = get_pref_value(value)
-            override_val = get_pref_value(override[key])
-            if override_val != base_val:
-                conflicts.append(full_key)
-        elif isinstance(value, dict) and not key.startswith("must_") and isinstance(override.get(key), dict):
-            conflicts.extend(find_must_conflicts(value, override[key], full_key))
+    stack: list[tuple[dict, dict, str]] = [(base, override, prefix)]
+    while stack:
+        base, override, prefix = stack.pop()
+        must = _must_keys(base)
+        for key in sorted(must & override.keys()):
+            if _overrides_must(base[key], override[key]):
+                conflicts.append(f"{prefix}.{key}" if prefix else key)
+        nested: list[tuple[dict, dict, str]] = []
+        # Only keys present on both sides can hold nested conflicts. Project
+        # overrides are usually a handful of keys against the full framework
+        # tree, so walk the override side and probe base.
+        for key, other in override.items():
+            if key in must or key not in base:
+                continue
+            value = base[key]
+            if isinstance(value, dict) and isinstance(other, dict):
+                nested.append((value, other, f"{prefix}.{key}" if prefix else key))
+        stack.extend(reversed(nested))
     return conflicts
 
 
-def merge_preferences(framework_path: Path | None = None, project_path: Path | None = None) -> dict[str, Any]:
+def merge_preferences(
+    framework_path: str | Path | None = None, project_path: str | Path | None = None
+) -> dict[str, Any]:
     """Merge framework + project preferences. Project overrides framework.
 
+    The merged result is cached until either file changes on disk.
     Raises ValueError if project tries to override must_* rules.
     """
-    framework_path = framework_path or FRAMEWORK_PREFERENCES
+    framework_path = framework_path or _FRAMEWORK_PREFERENCES_STR
+    sig = (_file_signature(framework_path), _file_signature(project_path))
+    key = ("merged", os.fspath(framework_path), str(project_path))
+    cached = _LOAD_CACHE.get(key)
+    if cached and cached[0] == sig:
+        return cached[1]
+
     fw_prefs = load_preferences(framework_path)
     proj_prefs = load_preferences(project_path) if project_path else {}
 
-    if not proj_prefs:
-        return fw_prefs
-
-    conflicts = find_must_conflicts(fw_prefs, proj_prefs)
-    if conflicts:
-        raise ValueError(
-            f"Project preferences conflict with must_* framework rules: {conflicts}. "
-            "These require human resolution."
-        )
-
-    return _deep_merge(fw_prefs, proj_prefs)
+    if not proj_prefs or proj_prefs is fw_prefs:
+        merged = fw_prefs
+    else:
+        conflicts: list[str] = []
+        merged = _deep_merge(fw_prefs, proj_prefs, conflicts)
+        if conflicts:
+            raise ValueError(
+                f"Project preferences conflict with must_* framework rules: {conflicts}. "
+                "These require human resolution."
+            )
+
+    _LOAD_CACHE[key] = (sig, merged)
+    return merged
@@ -4,7 +4,18 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+_UTC = timezone.utc
+
+
+def utc_now_iso(_now=datetime.now, _tz=_UTC) -> str:
+    """Current UTC time as an ISO-8601 string; the timestamp default factory.
+
+    The defaults bind the clock and timezone once so each call skips the
+    global and attribute lookups.
+    """
+    return _now(_tz).isoformat()
 
 
 # ---------------------------------------------------------------------------
@@ -64,8 +75,8 @@ class Task(BaseModel):
     escalation_id: str | None = None
     attempt: int = 0
     dependencies: list[str] = Field(default_factory=list)  # task IDs this depends on
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
-    updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: str = Field(default_factory=utc_now_iso)
+    updated_at: str = Field(default_factory=utc_now_iso)
 
 
 # ---------------------------------------------------------------------------
@@ -151,7 +162,7 @@ class RunLog(BaseModel):
     duration_ms: int = 0
     git_commit: str | None = None
     model_used: str = ""
-    timestamp: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    timestamp: str = Field(default_factory=utc_now_iso)
 
 
 # ---------------------------------------------------------------------------
@@ -166,7 +177,7 @@ class Escalation(BaseModel):
     reason: str
     resolved: bool = False
     resolution: str = ""
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: str = Field(default_factory=utc_now_iso)
     resolved_at: str | None = None
 
 
@@ -183,5 +194,22 @@ class ProjectState(BaseModel):
     tasks_approved: bool = False
     tasks: list[Task] = Field(default_factory=list)
     escalations: list[Escalation] = Field(default_factory=list)
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
-    updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: str = Field(default_factory=utc_now_iso)
+    updated_at: str = Field(default_factory=utc_now_iso)
+
+    # Scheduler memo (see nova.state.transitive_dependents): the dependency
+    # graph it was computed from, and each task's transitive dependents.
+    # Private, so it's never serialized.
+    _dependents_cache: tuple[tuple, dict[str, frozenset[str]]] | None = PrivateAttr(default=None)
+    # Open nova.state.deferred_saves blocks, and whether a save was skipped
+    # inside one.
+    _save_depth: int = PrivateAttr(default=0)
+    _save_pending: bool = PrivateAttr(default=False)
+    # Task records in the state journal since the last full save
+    # (see nova.state.save_task).
+    _journal_records: int = PrivateAttr(default=0)
+    # blake2b digest of the last state.json written and that file's
+    # (mtime_ns, size) afterwards, so unchanged saves can be skipped.
+    _last_dump: tuple[bytes, tuple[int, int] | None] | None = PrivateAttr(default=None)
+    # Task ID -> position in tasks (see nova.state.get_task).
+    _task_index: dict[str, int] = PrivateAttr(default_factory=dict)
@@ -8,6 +8,9 @@ AGENTS_DIR = FRAMEWORK_ROOT / "agents"
 CONFIG_DIR = FRAMEWORK_ROOT / "config"
 KNOWLEDGE_DIR = FRAMEWORK_ROOT / "knowledge"
 PROJECTS_DIR = FRAMEWORK_ROOT / "projects"
+CACHE_DIR = FRAMEWORK_ROOT / ".nova-cache"
+RESPONSE_CACHE_DIR = CACHE_DIR / "responses"
+LESSONS_INDEX = CACHE_DIR / "lessons-index.json"
 
 MODELS_CONFIG = CONFIG_DIR / "models.json"
 PIPELINES_DIR = CONFIG_DIR / "pipelines"
@@ -1,9 +1,9 @@
 """Prompt composition engine for agent invocations."""
 
-from pathlib import Path
+import os
+from collections.abc import Callable
 from typing import Any
 
-from nova.config import get_pref_value, is_structured_pref
 from nova.models import AgentRole, Task
 from nova.paths import AGENTS_DIR, KNOWLEDGE_DIR
 
@@ -12,26 +12,67 @@ from nova.paths import AGENTS_DIR, KNOWLEDGE_DIR
 # Template loading
 # ---------------------------------------------------------------------------
 
-def load_agent_template(role: AgentRole) -> str:
-    path = AGENTS_DIR / f"{role.value}.md"
-    if not path.exists():
-        raise FileNotFoundError(f"Agent template not found: {path}")
-    return path.read_text()
+# role value -> ((mtime_ns, size), template text)
+_template_cache: dict[str, tuple[tuple[int, int], str]] = {}
+
+
+def load_agent_template(role: AgentRole | str) -> str:
+    """Load a role's prompt template, re-reading it only when the file changes."""
+    role_value = role.value if isinstance(role, AgentRole) else role
+    path = AGENTS_DIR / f"{role_value}.md"
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Agent template not found: {path}") from None
+
+    sig = (st.st_mtime_ns, st.st_size)
+    cached = _template_cache.get(role_value)
+    if cached and cached[0] == sig:
+        return cached[1]
+
+    template = path.read_text()
+    _template_cache[role_value] = (sig, template)
+    return template
 
 
 # ---------------------------------------------------------------------------
 # Preference extraction
 # ---------------------------------------------------------------------------
 
+# (preferences dict, instructions) from the last call. Merged preferences are
+# cached and shared read-only by nova.config, so the same dict object comes
+# back for every prompt in a run; holding a reference keeps the identity
+# check sound.
+_pref_instructions_cache: tuple[dict[str, Any], list[str]] | None = None
+
+
 def extract_preference_instructions(preferences: dict[str, Any]) -> list[str]:
-    """Walk merged preferences and collect all agent_instruction values."""
+    """Walk merged preferences and collect all agent_instruction values.
+
+    The returned list is shared between calls with the same preferences
+    object and must not be modified.
+    """
+    global _pref_instructions_cache
+
+    if not preferences:
+        return []
+
+    cached = _pref_instructions_cache
+    if cached and cached[0] is preferences:
+        return cached[1]
+
     instructions: list[str] = []
     for category, rules in preferences.items():
-        if not isinstance(rules, dict):
+        if type(rules) is not dict:
             continue
         for key, value in rules.items():
-            if is_structured_pref(value) and value.get("agent_instruction"):
-                instructions.append(f"[{category}.{key}] {value['agent_instruction']}")
+            # Inline is_structured_pref: parsed YAML only produces plain dicts.
+            if type(value) is dict and "value" in value:
+                instruction = value.get("agent_instruction")
+                if instruction:
+                    instructions.append(f"[{category}.{key}] {instruction}")
+
+    _pref_instructions_cache = (preferences, instructions)
     return instructions
 
 
@@ -39,21 +80,58 @@ def extract_preference_instructions(preferences: dict[str, Any]) -> list[str]:
 # Knowledge loading
 # ---------------------------------------------------------------------------
 
+KNOWLEDGE_FILES = ("escalation-patterns.md", "failed-patterns.md")
+
+# (signature, joined text) from the last load_knowledge() call.
+_knowledge_cache: tuple[tuple[tuple[str, int, int], ...], str] | None = None
+
+
+def _knowledge_signature() -> tuple[tuple[str, int, int], ...]:
+    """(path, mtime_ns, size) for every knowledge file, in load order."""
+    entries: list[tuple[str, int, int]] = []
+
+    try:
+        with os.scandir(KNOWLEDGE_DIR / "lessons") as it:
+            lessons = sorted(
+                (e.path, e.stat()) for e in it if e.name.endswith(".md") and e.is_file()
+            )
+    except FileNotFoundError:
+        lessons = []
+    entries.extend((path, st.st_mtime_ns, st.st_size) for path, st in lessons)
+
+    for filename in KNOWLEDGE_FILES:
+        path = os.path.join(KNOWLEDGE_DIR, filename)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((path, st.st_mtime_ns, st.st_size))
+
+    return tuple(entries)
+
+
 def load_knowledge() -> str:
-    """Load relevant knowledge (lessons, failed patterns, escalation patterns)."""
-    sections: list[str] = []
+    """Load relevant knowledge (lessons, failed patterns, escalation patterns).
 
-    lessons_dir = KNOWLEDGE_DIR / "lessons"
-    if lessons_dir.exists():
-        for f in sorted(lessons_dir.glob("*.md")):
-            sections.append(f.read_text().strip())
+    The joined text is reused until a knowledge file is added, removed or modified.
+    """
+    global _knowledge_cache
 
-    for filename in ("escalation-patterns.md", "failed-patterns.md"):
-        path = KNOWLEDGE_DIR / filename
-        if path.exists():
-            sections.append(path.read_text().strip())
+    signature = _knowledge_signature()
+    cached = _knowledge_cache
+    if cached and cached[0] == signature:
+        return cached[1]
 
-    return "\n\n".join(sections) if sections else ""
+    # Gather the raw bytes into one buffer and decode once at the end.
+    buf = bytearray()
+    for i, (path, _, _) in enumerate(signature):
+        if i:
+            buf += b"\n\n"
+        with open(path, "rb") as f:
+            buf += f.read().strip()
+    knowledge = buf.decode()
+    _knowledge_cache = (signature, knowledge)
+    return knowledge
 
 
 # ---------------------------------------------------------------------------
@@ -69,63 +147,103 @@ def compose_task_context(
     prior_feedback: str = "",
 ) -> str:
     """Format the task-specific context block for pipeline agents."""
-    parts: list[str] = []
-
-    parts.append(f"## Current Task\n\n"
-                 f"- **ID:** {task.id}\n"
-                 f"- **Title:** {task.title}\n"
-                 f"- **Description:** {task.description}\n"
-                 f"- **Attempt:** {task.attempt}\n"
-                 f"- **Version:** {task.version}")
+    buf: list[str] = []
+    append = buf.append
+
+    append("## Current Task\n\n- **ID:** ")
+    append(task.id)
+    append("\n- **Title:** ")
+    append(task.title)
+    append("\n- **Description:** ")
+    append(task.description)
+    append("\n- **Attempt:** ")
+    append(str(task.attempt))
+    append("\n- **Version:** ")
+    append(task.version)
 
     if task.acceptance_criteria:
-        criteria = "\n".join(f"  - {c}" for c in task.acceptance_criteria)
-        parts.append(f"- **Acceptance Criteria:**\n{criteria}")
+        append("\n- **Acceptance Criteria:**")
+        for c in task.acceptance_criteria:
+            append("\n  - ")
+            append(c)
 
     if task.dependencies:
-        deps = ", ".join(task.dependencies)
-        parts.append(f"- **Dependencies:** {deps}")
+        append("\n- **Dependencies:** ")
+        append(", ".join(task.dependencies))
 
     if spec_content:
-        parts.append(f"\n## Approved Spec\n\n{spec_content}")
+        append("\n\n## Approved Spec\n\n")
+        append(spec_content)
 
     if plan_content:
-        parts.append(f"\n## Approved Plan\n\n{plan_content}")
+        append("\n\n## Approved Plan\n\n")
+        append(plan_content)
 
     if file_tree:
-        parts.append(f"\n## Project File Tree\n\n```\n{file_tree}\n```")
+        append("\n\n## Project File Tree\n\n```\n")
+        append(file_tree)
+        append("\n```")
 
     if diff:
-        parts.append(f"\n## Code Changes (Git Diff)\n\n```diff\n{diff}\n```")
+        append("\n\n## Code Changes (Git Diff)\n\n```diff\n")
+        append(diff)
+        append("\n```")
 
     if prior_feedback:
-        parts.append(f"\n## Prior Attempt Feedback\n\n"
-                     f"The previous attempt was rejected. Address these issues:\n\n"
-                     f"{prior_feedback}")
+        append("\n\n## Prior Attempt Feedback\n\n"
+               "The previous attempt was rejected. Address these issues:\n\n")
+        append(prior_feedback)
 
-    return "\n".join(parts)
+    return "".join(buf)
 
 
 # ---------------------------------------------------------------------------
 # Main composer
 # ---------------------------------------------------------------------------
 
-CONTEXT_WINDOW = {
-    AgentRole.PLANNER: 180_000,
-    AgentRole.CODER: 180_000,
-    AgentRole.QA: 180_000,
-    AgentRole.DISTILLER: 180_000,
+# Keyed by role value, so callers can pass either an AgentRole or its string.
+CONTEXT_WINDOW: dict[str, int] = {
+    AgentRole.PLANNER.value: 180_000,
+    AgentRole.CODER.value: 180_000,
+    AgentRole.QA.value: 180_000,
+    AgentRole.DISTILLER.value: 180_000,
 }
 
 CHARS_PER_TOKEN_ESTIMATE = 4
 
 
-def _estimate_tokens(text: str) -> int:
-    return len(text) // CHARS_PER_TOKEN_ESTIMATE
+# (instructions list, rendered block) from the last call. The list comes
+# from extract_preference_instructions, which returns the same object for
+# the same preferences, so every prompt in a run reuses the rendered block.
+_pref_block_cache: tuple[list[str], str] | None = None
+
+
+def _preference_block(preferences: dict[str, Any]) -> str:
+    global _pref_block_cache
+
+    if not preferences:
+        return ""
+    instructions = extract_preference_instructions(preferences)
+    if not instructions:
+        return ""
+
+    cached = _pref_block_cache
+    if cached and cached[0] is instructions:
+        return cached[1]
+
+    formatted = "\n".join(f"- {inst}" for inst in instructions)
+    block = f"\n\n## Active Preferences\n\nYou MUST follow these instructions:\n\n{formatted}"
+    _pref_block_cache = (instructions, block)
+    return block
+
+
+def _knowledge_block() -> str:
+    knowledge = load_knowledge()
+    return f"\n\n## Knowledge Base\n\n{knowledge}" if knowledge else ""
 
 
 def compose_system_prompt(
-    role: AgentRole,
+    role: AgentRole | str,
     preferences: dict[str, Any],
     task: Task | None = None,
     spec_content: str = "",
@@ -140,18 +258,10 @@ def compose_system_prompt(
     Sections are added in priority order (highest first).
     If the prompt exceeds the token budget, lower-priority sections are trimmed.
     """
-    template = load_agent_template(role)
+    role_value = role.value if isinstance(role, AgentRole) else role
+    template = load_agent_template(role_value)
 
-    pref_instructions = extract_preference_instructions(preferences)
-    pref_block = ""
-    if pref_instructions:
-        formatted = "\n".join(f"- {inst}" for inst in pref_instructions)
-        pref_block = f"\n\n## Active Preferences\n\nYou MUST follow these instructions:\n\n{formatted}"
-
-    knowledge = load_knowledge()
-    knowledge_block = ""
-    if knowledge:
-        knowledge_block = f"\n\n## Knowledge Base\n\n{knowledge}"
+    pref_block = _preference_block(preferences)
 
     task_block = ""
     if task:
@@ -169,29 +279,37 @@ def compose_system_prompt(
         extra_block = f"\n\n## Additional Context\n\n{extra_context}"
 
     # Assemble in priority order: template > preferences > task > extra > knowledge
-    # Knowledge is lowest priority and gets trimmed first if over budget
-    sections = [
+    # Knowledge is lowest priority and gets trimmed first if over budget. It
+    # is built lazily, so it isn't loaded at all when the budget runs out first.
+    sections: list[tuple[str, str | Callable[[], str]]] = [
         ("template", template),
         ("preferences", pref_block),
         ("task", task_block),
         ("extra", extra_block),
-        ("knowledge", knowledge_block),
+        ("knowledge", _knowledge_block),
     ]
 
-    budget = CONTEXT_WINDOW.get(role, 180_000)
+    budget = CONTEXT_WINDOW.get(role_value, 180_000)
     # Reserve 30% of context window for the model's output
     prompt_budget_tokens = int(budget * 0.7)
+    budget_chars = prompt_budget_tokens * CHARS_PER_TOKEN_ESTIMATE
 
-    prompt = ""
+    # Track the running length instead of re-measuring a growing
+    # concatenation; the prompt is joined once at the end.
+    prompt_parts: list[str] = []
+    prompt_len = 0
     for name, section in sections:
+        if callable(section):
+            section = section()
         if not section:
             continue
-        candidate = prompt + section
-        if _estimate_tokens(candidate) > prompt_budget_tokens:
-            remaining_chars = (prompt_budget_tokens - _estimate_tokens(prompt)) * CHARS_PER_TOKEN_ESTIMATE
+        if prompt_len + len(section) > budget_chars:
+            remaining_chars = budget_chars - prompt_len
             if remaining_chars > 200:
-                prompt += section[:remaining_chars] + "\n\n[... truncated due to context budget ...]"
+                prompt_parts.append(section[:remaining_chars])
+                prompt_parts.append("\n\n[... truncated due to context budget ...]")
             break
-        prompt = candidate
+        prompt_parts.append(section)
+        prompt_len += len(section)
 
-    return prompt.strip()
+    return "".join(prompt_parts).strip()
@@ -1,14 +1,24 @@
 """Pipeline runner — executes tasks through the Coder → Lint/Build → QA pipeline."""
 
+import atexit
+import heapq
+import io
 import json
+import os
+import queue
+import re
+import signal
 import subprocess
 import threading
 import time
+from collections import Counter, defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timezone
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
 from typing import Any
 
+from pydantic import ValidationError
 from rich.console import Console
 from rich.panel import Panel
 
@@ -29,44 +39,65 @@ from nova.models import (
     RunLog,
     Task,
     TaskState,
+    utc_now_iso,
 )
 
 from nova.paths import get_project_docs, get_project_logs, get_project_root, get_project_src
 from nova.prompt import compose_system_prompt
-from nova.state import all_tasks_done, save_state, transition_phase, transition_task
+from nova.state import (
+    TERMINAL_STATES,
+    all_tasks_done,
+    count_task_states,
+    deferred_saves,
+    done_count,
+    get_task,
+    save_state,
+    save_task,
+    task_priority,
+    transition_phase,
+    transition_task,
+)
 
 console = Console()
 MAX_ATTEMPTS = 3
+MAX_PARALLEL_TASKS = 4  # concurrent agent calls per batch; keeps us under the API rate limit
 
 
 # ---------------------------------------------------------------------------
 # File tree builder
 # ---------------------------------------------------------------------------
 
+_TREE_SKIP = {".git", "node_modules", "dist", ".next", "__pycache__", ".venv", ".cache", ".DS_Store"}
+
+
 def build_file_tree(root: Path, prefix: str = "") -> str:
     """Build a text representation of the directory tree for Coder context."""
-    if not root.exists():
+    lines: list[str] = []
+    _tree_lines(os.fspath(root), prefix, lines)
+    if not lines:
         return "(empty — no files yet)"
+    return "\n".join(lines)
 
-    SKIP = {".git", "node_modules", "dist", ".next", "__pycache__", ".venv", ".cache", ".DS_Store"}
-    entries = sorted(root.iterdir(), key=lambda p: (not p.is_dir(), p.name))
-    entries = [e for e in entries if e.name not in SKIP]
-
-    if not entries:
-        return "(empty — no files yet)"
 
-    lines: list[str] = []
-    for i, entry in enumerate(entries):
-        is_last = i == len(entries) - 1
-        connector = "└── " if is_last else "├── "
-        lines.append(f"{prefix}{connector}{entry.name}")
-        if entry.is_dir():
-            extension = "    " if is_last else "│   "
-            subtree = build_file_tree(entry, prefix + extension)
-            if subtree and not subtree.startswith("(empty"):
-                lines.append(subtree)
+def _tree_lines(path: str, prefix: str, lines: list[str]) -> None:
+    # scandir gives each entry's type from the directory listing, so no
+    # per-entry stat; symlinked directories are listed but not followed.
+    try:
+        with os.scandir(path) as it:
+            entries = [
+                (not entry.is_dir(follow_symlinks=False), entry.name, entry.path)
+                for entry in it
+                if entry.name not in _TREE_SKIP
+            ]
+    except OSError:
+        return
+    entries.sort()
 
-    return "\n".join(lines)
+    last = len(entries) - 1
+    for i, (is_file, name, entry_path) in enumerate(entries):
+        lines.append(f"{prefix}{'└── ' if i == last else '├── '}{name}")
+        if not is_file:
+            _tree_lines(entry_path, prefix + ("    " if i == last else "│   "), lines)
 
 
 # ---------------------------------------------------------------------------
@@ -102,44 +133,133 @@ def apply_file_operations(operations: list[FileOperation], project_src: Path) ->
 # Command execution
 # ---------------------------------------------------------------------------
 
-def execute_commands(commands: list[str], working_dir: Path) -> list[CommandResult]:
-    """Execute shell commands in the project directory."""
-    results: list[CommandResult] = []
+COMMAND_TIMEOUT = 300  # seconds
+_TIMEOUT_MESSAGE = f"Command timed out after {COMMAND_TIMEOUT} seconds"
 
-    for cmd in commands:
-        console.print(f"  [cyan]$[/cyan] {cmd}")
+
+OUTPUT_TAIL_CHARS = 2000
+# Raw bytes kept per stream; enough for OUTPUT_TAIL_CHARS of multi-byte UTF-8.
+_OUTPUT_TAIL_BYTES = OUTPUT_TAIL_CHARS * 4
+
+
+_READ_CHUNK = 65536
+# Scratch read buffers shared by the drain threads. A drain takes one for
+# its lifetime and puts it back, so a run of many commands reuses a couple
+# of buffers instead of allocating a fresh bytes object per pipe read.
+_scratch_buffers: list[bytearray] = []
+
+
+def _drain_tail(stream: Any, tail: bytearray) -> None:
+    """Read a pipe to EOF, keeping only the last _OUTPUT_TAIL_BYTES bytes."""
+    try:
+        buf = _scratch_buffers.pop()
+    except IndexError:
+        buf = bytearray(_READ_CHUNK)
+    view = memoryview(buf)
+    try:
+        while n := stream.readinto1(buf):
+            tail += view[:n]
+            if len(tail) > 2 * _OUTPUT_TAIL_BYTES:
+                del tail[:-_OUTPUT_TAIL_BYTES]
+    finally:
+        view.release()
+        _scratch_buffers.append(buf)
+    stream.close()
+
+
+def _decode_tail(tail: bytearray) -> str:
+    text = tail[-_OUTPUT_TAIL_BYTES:].decode(errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")[-OUTPUT_TAIL_CHARS:]
+
+
+def _kill_process_tree(proc: subprocess.Popen) -> None:
+    # The command runs through a shell in its own session, so kill the whole
+    # group; otherwise children would keep the pipes open.
+    if hasattr(os, "killpg"):
         try:
-            proc = subprocess.run(
-                cmd,
-                shell=True,
-                cwd=str(working_dir),
-                capture_output=True,
-                text=True,
-                timeout=300,
-            )
-            result = CommandResult(
-                command=cmd,
-                exit_code=proc.returncode,
-                stdout=proc.stdout[-2000:] if proc.stdout else "",
-                stderr=proc.stderr[-2000:] if proc.stderr else "",
-            )
-            results.append(result)
+            os.killpg(proc.pid, signal.SIGKILL)
+            return
+        except ProcessLookupError:
+            return
+    proc.kill()
 
-            if proc.returncode == 0:
-                console.print(f"    [green]✓[/green] exit 0")
-            else:
-                console.print(f"    [red]✗[/red] exit {proc.returncode}")
-                if proc.stderr:
-                    console.print(f"    [dim]{proc.stderr[:500]}[/dim]")
-
-        except subprocess.TimeoutExpired:
-            results.append(CommandResult(
-                command=cmd,
-                exit_code=-1,
-                stderr="Command timed out after 300 seconds",
-            ))
-            console.print(f"    [red]✗ timeout[/red]")
 
+def _run_command(cmd: str, working_dir: Path) -> CommandResult:
+    """Run one shell command, keeping only the tail of its output.
+
+    Output is drained as it arrives into bounded buffers, so a noisy build
+    never has its full output held in memory.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        shell=True,
+        cwd=str(working_dir),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    out_tail, err_tail = bytearray(), bytearray()
+    drains = [
+        threading.Thread(target=_drain_tail, args=(proc.stdout, out_tail), daemon=True),
+        threading.Thread(target=_drain_tail, args=(proc.stderr, err_tail), daemon=True),
+    ]
+    for t in drains:
+        t.start()
+
+    try:
+        returncode = proc.wait(timeout=COMMAND_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        _kill_process_tree(proc)
+        proc.wait()
+        for t in drains:
+            t.join()
+        return CommandResult(command=cmd, exit_code=-1, stderr=_TIMEOUT_MESSAGE)
+
+    for t in drains:
+        t.join()
+    return CommandResult(
+        command=cmd,
+        exit_code=returncode,
+        stdout=_decode_tail(out_tail),
+        stderr=_decode_tail(err_tail),
+    )
+
+
+def _report_lines(result: CommandResult) -> list[str]:
+    if result.exit_code == 0:
+        return ["    [green]✓[/green] exit 0"]
+    if result.exit_code == -1 and result.stderr == _TIMEOUT_MESSAGE:
+        return ["    [red]✗ timeout[/red]"]
+    lines = [f"    [red]✗[/red] exit {result.exit_code}"]
+    if result.stderr:
+        lines.append(f"    [dim]{result.stderr[:500]}[/dim]")
+    return lines
+
+
+def execute_commands(commands: list[str], working_dir: Path, parallel: bool = False) -> list[CommandResult]:
+    """Execute shell commands in the project directory.
+
+    Commands run in order by default. With parallel=True (for independent
+    commands such as build + lint) they run concurrently and results are
+    reported in the original order once all have finished.
+    """
+    if parallel and len(commands) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(commands), os.cpu_count() or 1)) as executor:
+            results = list(executor.map(lambda cmd: _run_command(cmd, working_dir), commands))
+        # One print per command, so each report reaches the terminal as a
+        # single write.
+        for result in results:
+            console.print(f"  [cyan]$[/cyan] {result.command}", *_report_lines(result), sep="\n")
+        return results
+
+    results: list[CommandResult] = []
+    for cmd in commands:
+        # The command is shown before it runs, so a slow one isn't silent.
+        console.print(f"  [cyan]$[/cyan] {cmd}")
+        result = _run_command(cmd, working_dir)
+        console.print(*_report_lines(result), sep="\n")
+        results.append(result)
     return results
 
 
@@ -147,14 +267,52 @@ def execute_commands(commands: list[str], working_dir: Path) -> list[CommandResu
 # Run logging
 # ---------------------------------------------------------------------------
 
-def save_run_log(log: RunLog, project_name: str) -> Path:
-    """Write a structured run log to logs/runs/."""
-    logs_dir = get_project_logs(project_name) / "runs"
-    logs_dir.mkdir(parents=True, exist_ok=True)
+# Run logs are serialized on the caller's thread (so later mutations of the
+# RunLog can't race the write) and written by a single background thread in
+# FIFO order. Anything that reads logs back calls flush_run_logs() first.
+_log_queue: queue.Queue[tuple[Path, bytes]] = queue.Queue()
+_log_writer_lock = threading.Lock()
+_log_writer: threading.Thread | None = None
+
+
+def _write_run_logs() -> None:
+    while True:
+        path, data = _log_queue.get()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        except OSError as e:
+            console.print(f"[red]Could not write run log {path}: {e}[/red]")
+        finally:
+            _log_queue.task_done()
+
 
+def _ensure_log_writer() -> None:
+    global _log_writer
+    if _log_writer is not None:
+        return
+    with _log_writer_lock:
+        if _log_writer is None:
+            thread = threading.Thread(target=_write_run_logs, name="nova-run-logs", daemon=True)
+            thread.start()
+            atexit.register(flush_run_logs)
+            _log_writer = thread
+
+
+def flush_run_logs() -> None:
+    """Block until every queued run log has been written."""
+    if _log_writer is not None:
+        _log_queue.join()
+
+
+def save_run_log(log: RunLog, project_name: str) -> Path:
+    """Queue a structured run log for writing to logs/runs/. Returns its path."""
     filename = f"{log.task_id}_{log.role.value}_{log.attempt}.json"
-    path = logs_dir / filename
-    path.write_text(log.model_dump_json(indent=2))
+    path = get_project_logs(project_name) / "runs" / filename
+    _ensure_log_writer()
+    # The core serializer emits bytes directly; model_dump_json would
+    # decode them to str only for us to encode them again.
+    _log_queue.put((path, log.__pydantic_serializer__.to_json(log, indent=2)))
     return path
 
 
@@ -162,9 +320,27 @@ def save_run_log(log: RunLog, project_name: str) -> Path:
 # Artifact loading
 # ---------------------------------------------------------------------------
 
+# (project, subdir, filename) -> ((mtime_ns, size), text)
+_artifact_cache: dict[tuple[str, str, str], tuple[tuple[int, int], str]] = {}
+
+
 def _load_artifact(project_name: str, subdir: str, filename: str) -> str:
+    """Read a docs artifact, reusing the last read while the file is unchanged."""
     path = get_project_docs(project_name) / subdir / filename
-    return path.read_text() if path.exists() else ""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return ""
+
+    key = (project_name, subdir, filename)
+    sig = (st.st_mtime_ns, st.st_size)
+    cached = _artifact_cache.get(key)
+    if cached and cached[0] == sig:
+        return cached[1]
+
+    text = path.read_text()
+    _artifact_cache[key] = (sig, text)
+    return text
 
 
 # ---------------------------------------------------------------------------
@@ -191,73 +367,194 @@ def build_file_diff(operations: list[FileOperation]) -> str:
     return "\n\n".join(parts)
 
 
+# ---------------------------------------------------------------------------
+# Source tree walk
+# ---------------------------------------------------------------------------
+
+# Directories none of the context builders look into.
+_CONTEXT_SKIP_DIRS = {".git", "node_modules", "dist", ".next", "__pycache__", ".venv", ".cache"}
+
+
+def _walk_source_tree(root: Path) -> list[Path]:
+    """Every file under root outside the skipped directories, sorted by relative path.
+
+    One os.scandir walk shared by the context builders, which filter the
+    result by extension themselves.
+    """
+    found: list[tuple[str, str]] = []
+    stack = [("", os.fspath(root))]
+    while stack:
+        rel_dir, path = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                rel = f"{rel_dir}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in _CONTEXT_SKIP_DIRS:
+                        stack.append((rel + os.sep, entry.path))
+                elif entry.is_file():
+                    found.append((rel, entry.path))
+    found.sort()
+    return [Path(path) for _, path in found]
+
+
+def _root_prefix_len(root: Path) -> int:
+    """Length of root's path plus separator.
+
+    Walked paths all start with it, so slicing it off gives the relative
+    path without a relative_to() parts comparison per file.
+    """
+    return len(os.path.join(os.fspath(root), ""))
+
+
 # ---------------------------------------------------------------------------
 # Dependent file scanner
 # ---------------------------------------------------------------------------
 
 SCAN_EXTENSIONS = {".js", ".jsx", ".ts", ".tsx", ".vue", ".svelte", ".py", ".go", ".rs"}
 
+# Lines starting (after indentation) with "import " or "from ", found in one
+# pass over the file instead of stripping and testing every line.
+_IMPORT_LINE_RE = re.compile(r"^[ \t]*(?:import|from) [^\n]*", re.MULTILINE)
+_WORD_RE = re.compile(r"\w+")
+
 
-def scan_dependents(project_src: Path) -> str:
+# Per-project cache of each source file's import lines, keyed by relative
+# path: {"mtime_ns": ..., "size": ..., "imports": [...]}. Lives in the
+# project's logs dir so it never shows up in the Coder's view of the code.
+IMPORT_INDEX_FILE = ".nova-index.json"
+
+
+def _read_import_lines(path: Path) -> list[str] | None:
+    """The stripped import lines of a source file, or None if it can't be read."""
+    try:
+        content = path.read_text(errors="replace")
+    except OSError:
+        return None
+    return [line.strip() for line in _IMPORT_LINE_RE.findall(content)]
+
+
+def _load_json_index(index_path: Path) -> dict[str, Any]:
+    try:
+        with open(index_path, "rb") as f:
+            index = json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+
+def _save_json_index(index_path: Path, index: dict[str, Any]) -> None:
+    # Written to a temp file and swapped in, so an interrupted run can't
+    # leave a truncated index behind.
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(index, separators=(",", ":")))
+    os.replace(tmp_path, index_path)
+
+
+def scan_dependents(
+    project_src: Path,
+    files: list[Path] | None = None,
+    index_path: Path | None = None,
+) -> str:
     """Scan source files and build a dependency map with actual import lines.
 
     Returns a text block showing each shared file, who imports from it,
     and the exact import statement each consumer uses. This prevents the
     Coder from renaming exports without updating all importers.
-    """
-    if not project_src.exists():
-        return ""
 
-    skip = {"node_modules", "dist", ".next", "__pycache__", ".venv", ".cache"}
-    source_files: list[Path] = []
-    for p in project_src.rglob("*"):
-        if p.is_file() and p.suffix in SCAN_EXTENSIONS:
-            if not any(part in skip for part in p.parts):
-                source_files.append(p)
+    If index_path is given, import lines are cached there per file and only
+    files whose mtime or size changed since the last scan are re-read.
+    """
+    if files is None:
+        if not project_src.exists():
+            return ""
+        files = _walk_source_tree(project_src)
+    source_files = [p for p in files if p.suffix in SCAN_EXTENSIONS]
 
     if not source_files:
         return ""
 
-    import_map: dict[str, list[tuple[str, str]]] = {}
+    # Index files by stem. Stems must stand alone in an import line (not be
+    # part of a longer identifier), so a plain identifier stem matches
+    # exactly when it is one of the line's \w+ tokens: a set lookup per
+    # token. Stems with other characters ("App.test", "my-widget") go through
+    # one regex, longest first, and their matches are blanked out before
+    # tokenizing so "foo.test" isn't also read as "foo".
+    root_len = _root_prefix_len(project_src)
+    rel_paths = {sf: os.fspath(sf)[root_len:] for sf in source_files}
+    stem_to_paths: dict[str, list[str]] = defaultdict(list)
+    for sf, rel in rel_paths.items():
+        if sf.stem:
+            stem_to_paths[sf.stem].append(rel)
+    word_stems = {stem for stem in stem_to_paths if _WORD_RE.fullmatch(stem)}
+    other_stems = sorted(stem_to_paths.keys() - word_stems, key=len, reverse=True)
+    other_re = (
+        re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, other_stems)) + r")(?!\w)")
+        if other_stems
+        else None
+    )
 
-    for sf in source_files:
-        try:
-            content = sf.read_text(errors="replace")
-        except OSError:
-            continue
+    import_map: dict[str, set[tuple[str, str]]] = defaultdict(set)
+    old_index = _load_json_index(index_path) if index_path else {}
+    new_index: dict[str, dict[str, Any]] = {}
 
-        rel = str(sf.relative_to(project_src))
-        for line in content.splitlines():
-            stripped = line.strip()
-            if not (stripped.startswith("import ") or stripped.startswith("from ")):
+    for sf, rel in rel_paths.items():
+        if index_path:
+            try:
+                st = os.stat(sf)
+            except OSError:
+                continue
+            cached = old_index.get(rel)
+            if cached and cached.get("mtime_ns") == st.st_mtime_ns and cached.get("size") == st.st_size:
+                import_lines = cached["imports"]
+            else:
+                import_lines = _read_import_lines(sf)
+                if import_lines is None:
+                    continue
+            new_index[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "imports": import_lines}
+        else:
+            import_lines = _read_import_lines(sf)
+            if import_lines is None:
                 continue
-            for other in source_files:
-                other_rel = str(other.relative_to(project_src))
-                stem = other.stem
-                if stem in stripped and other_rel != rel:
-                    import_map.setdefault(other_rel, [])
-                    entry = (rel, stripped)
-                    if entry not in import_map[other_rel]:
-                        import_map[other_rel].append(entry)
+
+        for stripped in import_lines:
+            entry = (rel, stripped)
+            if other_re is None:
+                stems = word_stems.intersection(_WORD_RE.findall(stripped))
+            else:
+                stems = set(other_re.findall(stripped))
+                stems.update(word_stems.intersection(_WORD_RE.findall(other_re.sub(" ", stripped))))
+            for stem in stems:
+                for other_rel in stem_to_paths[stem]:
+                    if other_rel != rel:
+                        import_map[other_rel].add(entry)
+
+    if index_path and new_index != old_index:
+        try:
+            _save_json_index(index_path, new_index)
+        except OSError:
+            pass  # the index is only a cache
 
     if not import_map:
         return ""
 
-    lines = [
-        "## Import Dependency Map",
-        "",
+    buf = io.StringIO()
+    buf.write(
+        "## Import Dependency Map\n\n"
         "CRITICAL: If you modify any file listed below, you MUST preserve "
         "the exact export names that importers use. If you rename an export, "
-        "you MUST update ALL files that import it in the same set of file_operations.",
-        "",
-    ]
+        "you MUST update ALL files that import it in the same set of file_operations.\n"
+    )
     for target, importers in sorted(import_map.items()):
-        lines.append(f"### {target}")
+        buf.write(f"\n### {target}\n")
         for importer_path, import_line in sorted(importers):
-            lines.append(f"  - `{importer_path}`: `{import_line}`")
-        lines.append("")
+            buf.write(f"  - `{importer_path}`: `{import_line}`\n")
 
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
 # ---------------------------------------------------------------------------
@@ -265,100 +562,174 @@ def scan_dependents(project_src: Path) -> str:
 # ---------------------------------------------------------------------------
 
 MAX_FILE_CONTENT_CHARS = 80_000  # total budget for all file contents
+READ_WORKERS = 8
+
 
-def read_existing_files(project_src: Path) -> str:
+def _safe_read(path: Path) -> str | None:
+    """Read a source file as text, or None if it can't be read.
+
+    At most MAX_FILE_CONTENT_CHARS + 1 characters are read: no file can
+    contribute more than the whole budget, and the extra character is
+    enough for the budget check to see that it overflowed. Large lockfiles
+    and bundles are never read in full.
+    """
+    try:
+        with open(path, errors="replace") as f:
+            return f.read(MAX_FILE_CONTENT_CHARS + 1)
+    except OSError:
+        return None
+
+
+def read_existing_files(project_src: Path, files: list[Path] | None = None) -> str:
     """Read all source files and return their contents for the Coder.
 
     Gives the Coder full visibility into existing code so edits are informed.
     Files are sorted by path and truncated to fit within the token budget.
     """
-    if not project_src.exists():
-        return ""
+    if files is None:
+        if not project_src.exists():
+            return ""
+        files = _walk_source_tree(project_src)
 
-    skip = {"node_modules", "dist", ".next", "__pycache__", ".venv", ".cache", ".git"}
     code_exts = {
         ".js", ".jsx", ".ts", ".tsx", ".vue", ".svelte", ".py", ".go", ".rs",
         ".html", ".css", ".scss", ".json", ".yaml", ".yml", ".toml", ".md",
     }
 
-    files: list[tuple[str, str]] = []
+    source_paths = [p for p in files if p.suffix in code_exts]
+    blocks: list[tuple[str, str]] = []
     total_chars = 0
+    root_len = _root_prefix_len(project_src)
+
+    # Reads are latency-bound, so overlap them; map() keeps the sorted order
+    # and the budget is applied serially below. Reads still queued when the
+    # budget runs out are cancelled.
+    executor = ThreadPoolExecutor(max_workers=READ_WORKERS)
+    try:
+        for p, content in zip(source_paths, executor.map(_safe_read, source_paths)):
+            if content is None:
+                continue
 
-    source_paths = sorted(
-        (p for p in project_src.rglob("*")
-         if p.is_file() and p.suffix in code_exts
-         and not any(part in skip for part in p.parts)),
-        key=lambda p: str(p.relative_to(project_src)),
-    )
-
-    for p in source_paths:
-        try:
-            content = p.read_text(errors="replace")
-        except OSError:
-            continue
-
-        rel = str(p.relative_to(project_src))
+            rel = os.fspath(p)[root_len:]
 
-        if total_chars + len(content) > MAX_FILE_CONTENT_CHARS:
-            remaining = MAX_FILE_CONTENT_CHARS - total_chars
-            if remaining > 200:
-                content = content[:remaining] + "\n... (truncated)"
-                files.append((rel, content))
-            break
+            if total_chars + len(content) > MAX_FILE_CONTENT_CHARS:
+                remaining = MAX_FILE_CONTENT_CHARS - total_chars
+                if remaining > 200:
+                    content = content[:remaining] + "\n... (truncated)"
+                    blocks.append((rel, content))
+                break
 
-        files.append((rel, content))
-        total_chars += len(content)
+            blocks.append((rel, content))
+            total_chars += len(content)
+    finally:
+        executor.shutdown(cancel_futures=True)
 
-    if not files:
+    if not blocks:
         return ""
 
-    parts = [
-        "## Existing File Contents",
-        "",
+    # Written straight into one buffer: file contents are the bulk of this
+    # block, so don't wrap each one in an intermediate f-string as well.
+    buf = io.StringIO()
+    buf.write(
+        "## Existing File Contents\n\n"
         "Below are the current contents of all project files. When editing a file, "
         "you MUST use this as your starting point — do NOT rewrite from scratch "
-        "unless the task explicitly requires it.",
-        "",
-    ]
-    for rel_path, content in files:
-        parts.append(f"### {rel_path}\n```\n{content}\n```\n")
+        "unless the task explicitly requires it.\n"
+    )
+    for rel_path, content in blocks:
+        buf.write(f"\n### {rel_path}\n```\n")
+        buf.write(content)
+        buf.write("\n```\n")
 
-    return "\n".join(parts)
+    return buf.getvalue()
 
 
 # ---------------------------------------------------------------------------
 # Dependency checking
 # ---------------------------------------------------------------------------
 
-def _deps_satisfied(task: Task, state: ProjectState) -> bool:
-    """Check if all of a task's dependencies are DONE or ARCHIVED."""
+def _done_ids(state: ProjectState) -> set[str]:
+    return {t.id for t in state.tasks if t.state in TERMINAL_STATES}
+
+
+def _deps_satisfied(task: Task, state: ProjectState, done_ids: set[str] | None = None) -> bool:
+    """Check if all of a task's dependencies are DONE or ARCHIVED.
+
+    Pass done_ids when checking several tasks against the same state, so the
+    task list is scanned once rather than once per task.
+    """
     if not task.dependencies:
         return True
-    done_ids = {
-        t.id for t in state.tasks
-        if t.state in (TaskState.DONE, TaskState.ARCHIVED)
-    }
+    if done_ids is None:
+        done_ids = _done_ids(state)
     return all(dep in done_ids for dep in task.dependencies)
 
 
+def _runnable_candidates(state: ProjectState) -> list[Task]:
+    ready = [t for t in state.tasks if t.state == TaskState.READY]
+    if not any(t.dependencies for t in ready):
+        return ready
+    done_ids = _done_ids(state)
+    return [t for t in ready if _deps_satisfied(t, state, done_ids)]
+
+
 def get_next_runnable_task(state: ProjectState) -> Task | None:
     """Get the next READY task whose dependencies are all satisfied."""
-    candidates = [
-        t for t in state.tasks
-        if t.state == TaskState.READY and _deps_satisfied(t, state)
-    ]
+    candidates = _runnable_candidates(state)
     if not candidates:
         return None
-    return sorted(candidates, key=lambda t: t.order)[0]
+    return min(candidates, key=task_priority(state))
 
 
 def get_all_runnable_tasks(state: ProjectState) -> list[Task]:
-    """Get ALL READY tasks whose dependencies are satisfied, sorted by order."""
-    candidates = [
-        t for t in state.tasks
-        if t.state == TaskState.READY and _deps_satisfied(t, state)
-    ]
-    return sorted(candidates, key=lambda t: t.order)
+    """Get ALL READY tasks whose dependencies are satisfied, highest priority first.
+
+    Tasks that unblock the most downstream work come first, so they are the
+    ones started when a batch is wider than MAX_PARALLEL_TASKS.
+    """
+    return sorted(_runnable_candidates(state), key=task_priority(state))
+
+
+# ---------------------------------------------------------------------------
+# Coder context cache
+# ---------------------------------------------------------------------------
+
+def _source_signature(project_src: Path) -> tuple[tuple[str, int, int], ...]:
+    """(path, mtime_ns, size) for every entry under project_src.
+
+    Stats only, no reads: any create, delete, rename or edit changes it.
+    """
+    entries: list[tuple[str, int, int]] = []
+    for dirpath, dirnames, filenames in os.walk(project_src):
+        dirnames[:] = sorted(d for d in dirnames if d not in _CONTEXT_SKIP_DIRS)
+        for name in sorted(filenames) + dirnames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(entries)
+
+
+@lru_cache(maxsize=8)
+def _coder_context(
+    project_src: Path,
+    signature: tuple,
+    index_path: Path | None = None,
+) -> tuple[str, str, str]:
+    """File tree, dependency map and file contents for a source tree state.
+
+    Keyed on the tree's signature, so Coder retries against an unchanged
+    tree reuse the previous walk and reads. index_path is passed on to
+    scan_dependents, so a changed tree only re-scans the files that changed.
+    """
+    files = _walk_source_tree(project_src)
+    return (
+        build_file_tree(project_src),
+        scan_dependents(project_src, files, index_path),
+        read_existing_files(project_src, files),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -377,9 +748,11 @@ def _run_coder(
     project_src = get_project_src(project_name)
     spec = _load_artifact(project_name, "spec", f"{state.version}.md")
     plan = _load_artifact(project_name, "plans", f"{state.version}.md")
-    file_tree = build_file_tree(project_src)
-    dep_map = scan_dependents(project_src)
-    existing_files = read_existing_files(project_src)
+    file_tree, dep_map, existing_files = _coder_context(
+        project_src,
+        _source_signature(project_src),
+        get_project_logs(project_name) / IMPORT_INDEX_FILE,
+    )
 
     extra_parts = [s for s in (dep_map, existing_files) if s]
     extra = "\n\n".join(extra_parts)
@@ -605,53 +978,65 @@ def _build_escalation_context(
     run_logs: list[RunLog],
 ) -> str:
     """Build a comprehensive context block for the Planner to resolve an escalation."""
-    parts = [
-        f"## Escalation: Task {task.id}",
-        f"\n**Title:** {task.title}",
-        f"**Description:** {task.description}",
-        f"**Attempts used:** {task.attempt}",
-        f"**Blocked reason:** {task.blocked_reason or 'Max attempts reached'}",
-    ]
+    buf = io.StringIO()
+    buf.write(
+        f"## Escalation: Task {task.id}\n"
+        f"\n**Title:** {task.title}\n"
+        f"**Description:** {task.description}\n"
+        f"**Attempts used:** {task.attempt}\n"
+        f"**Blocked reason:** {task.blocked_reason or 'Max attempts reached'}"
+    )
 
     if task.acceptance_criteria:
-        criteria = "\n".join(f"  - {c}" for c in task.acceptance_criteria)
-        parts.append(f"\n**Acceptance Criteria:**\n{criteria}")
+        buf.write("\n\n**Acceptance Criteria:**")
+        for c in task.acceptance_criteria:
+            buf.write(f"\n  - {c}")
 
     if run_logs:
-        parts.append("\n## Attempt History\n")
+        buf.write("\n\n## Attempt History\n")
         for log in run_logs:
-            parts.append(
-                f"### {log.role.value.title()} (attempt {log.attempt})\n"
+            buf.write(
+                f"\n### {log.role.value.title()} (attempt {log.attempt})\n"
                 f"- **Status:** {log.status.value}\n"
                 f"- **Summary:** {log.summary}"
             )
             if log.commands:
                 for cmd in log.commands:
                     if cmd.exit_code != 0:
-                        parts.append(f"- **Failed command:** `{cmd.command}` → exit {cmd.exit_code}")
+                        buf.write(f"\n- **Failed command:** `{cmd.command}` → exit {cmd.exit_code}")
                         if cmd.stderr:
-                            parts.append(f"  ```\n  {cmd.stderr[:500]}\n  ```")
-            parts.append("")
+                            buf.write(f"\n  ```\n  {cmd.stderr[:500]}\n  ```")
+            buf.write("\n")
 
-    return "\n".join(parts)
+    return buf.getvalue()
 
 
 def _load_run_logs(project_name: str, task_id: str) -> list[RunLog]:
     """Load all run logs for a given task."""
+    flush_run_logs()
     logs_dir = get_project_logs(project_name) / "runs"
     if not logs_dir.exists():
         return []
 
     logs: list[RunLog] = []
-    for path in sorted(logs_dir.glob(f"{task_id}_*.json")):
-        try:
-            data = json.loads(path.read_text())
-            logs.append(RunLog.model_validate(data))
-        except (json.JSONDecodeError, Exception):
-            continue
+    for path in sorted(logs_dir.glob(f"{task_id}_*.json"), key=attrgetter("name")):
+        log = _read_run_log(path)
+        if log is not None:
+            logs.append(log)
     return logs
 
 
+def _read_run_log(path: str | Path) -> RunLog | None:
+    """Load one run log file, or None if it's unreadable or malformed."""
+    try:
+        # Parse and validate straight from bytes; malformed JSON also
+        # surfaces as a ValidationError.
+        with open(path, "rb") as f:
+            return RunLog.model_validate_json(f.read())
+    except (OSError, ValidationError):
+        return None
+
+
 def _run_escalation(
     task: Task,
     state: ProjectState,
@@ -750,11 +1135,12 @@ def _resolve_escalation(
     escalation: Escalation,
     resolution: str,
     state: ProjectState,
+    now_iso: str | None = None,
 ) -> None:
     """Mark an escalation as resolved."""
     escalation.resolved = True
     escalation.resolution = resolution
-    escalation.resolved_at = datetime.now(timezone.utc).isoformat()
+    escalation.resolved_at = now_iso or utc_now_iso()
     save_state(state)
 
 
@@ -833,31 +1219,30 @@ def _run_coder_qa_loop(
     Returns True if QA passes. On failure, task is set to BLOCKED.
     """
     project_src = get_project_src(state.project_name)
-
     for attempt in range(MAX_ATTEMPTS):
         coder_output = _run_coder(task, state, models, preferences, prior_feedback)
 
         if coder_output is None:
             transition_task(task, TaskState.BLOCKED)
             task.blocked_reason = f"Coder could not complete the task{label}"
-            save_state(state)
+            save_task(state, task)
             return False
 
         # --- LINT / BUILD / QA ---
         transition_task(task, TaskState.IN_QA)
-        save_state(state)
+        save_task(state, task)
 
         build_cmds = _detect_build_commands(project_src)
         build_results: list[CommandResult] = []
         if build_cmds:
             console.print(f"\n  [bold]Running lint & build ({len(build_cmds)} commands):[/bold]")
-            build_results = execute_commands(build_cmds, project_src)
+            build_results = execute_commands(build_cmds, project_src, parallel=True)
 
         qa_output = _run_qa(task, state, models, preferences, coder_output, build_results)
 
         if isinstance(qa_output, QAOutput) and qa_output.verdict == "pass":
             transition_task(task, TaskState.DONE)
-            save_state(state)
+            save_task(state, task)
             _git_commit_task(task, state.project_name)
             suffix = f" (after escalation)" if label else ""
             console.print(f"\n  [bold green]✓ Task {task.id} complete{suffix}[/bold green]")
@@ -866,18 +1251,18 @@ def _run_coder_qa_loop(
         if isinstance(qa_output, QAOutput) and qa_output.verdict == "blocked":
             transition_task(task, TaskState.BLOCKED)
             task.blocked_reason = f"QA blocked: {qa_output.notes}"
-            save_state(state)
+            save_task(state, task)
             return False
 
         if attempt < MAX_ATTEMPTS - 1:
             prior_feedback = _build_qa_feedback(qa_output, build_results)
             console.print(f"\n  [yellow]Retrying Coder with QA feedback (attempt {attempt + 2}/{MAX_ATTEMPTS})...[/yellow]")
             transition_task(task, TaskState.IN_PROGRESS)
-            save_state(state)
+            save_task(state, task)
         else:
             transition_task(task, TaskState.BLOCKED)
             task.blocked_reason = f"Failed QA after {MAX_ATTEMPTS} attempts{label}"
-            save_state(state)
+            save_task(state, task)
             return False
 
     return False
@@ -894,7 +1279,7 @@ def run_task(
     project_src.mkdir(parents=True, exist_ok=True)
 
     transition_task(task, TaskState.IN_PROGRESS)
-    save_state(state)
+    save_task(state, task)
 
     console.print()
     console.print(Panel(
@@ -928,16 +1313,16 @@ def run_task(
         return False
 
     if isinstance(planner_output, PlannerOutput) and planner_output.resolution == "retry":
-        _resolve_escalation(escalation, planner_output.summary, state)
-
-        console.print(f"\n  [green]Planner provided new guidance. Resetting for retry...[/green]")
-        transition_task(task, TaskState.READY)
-        task.attempt = 0
-        task.blocked_reason = None
-        save_state(state)
-
-        transition_task(task, TaskState.IN_PROGRESS)
-        save_state(state)
+        with deferred_saves(state):
+            now = utc_now_iso()
+            _resolve_escalation(escalation, planner_output.summary, state, now)
+
+            console.print(f"\n  [green]Planner provided new guidance. Resetting for retry...[/green]")
+            transition_task(task, TaskState.READY, now_iso=now)
+            task.attempt = 0
+            task.blocked_reason = None
+            transition_task(task, TaskState.IN_PROGRESS, now_iso=now)
+            save_state(state)
 
         planner_feedback = (
             f"Planner escalation guidance (from Opus):\n\n"
@@ -954,9 +1339,10 @@ def run_task(
         )
 
     elif isinstance(planner_output, PlannerOutput) and planner_output.resolution == "human_needed":
-        _resolve_escalation(escalation, f"Human needed: {planner_output.summary}", state)
-        task.blocked_reason = f"Planner: human intervention needed — {planner_output.guidance}"
-        save_state(state)
+        with deferred_saves(state):
+            _resolve_escalation(escalation, f"Human needed: {planner_output.summary}", state)
+            task.blocked_reason = f"Planner: human intervention needed — {planner_output.guidance}"
+            save_state(state)
         console.print(f"\n  [yellow]Task requires human intervention. See blocked_reason for details.[/yellow]")
         return False
 
@@ -975,10 +1361,14 @@ def _run_batch_parallel(
     models: ModelsConfig,
     preferences: dict[str, Any],
 ) -> dict[str, bool]:
-    """Run a batch of independent tasks in parallel. Returns {task_id: success}."""
+    """Run a batch of independent tasks in parallel. Returns {task_id: success}.
+
+    Agent calls are network-bound, so threads overlap their latency; at most
+    MAX_PARALLEL_TASKS run at once and the rest queue behind them.
+    """
     results: dict[str, bool] = {}
 
-    with ThreadPoolExecutor(max_workers=len(batch)) as executor:
+    with ThreadPoolExecutor(max_workers=min(len(batch), MAX_PARALLEL_TASKS)) as executor:
         future_to_task = {
             executor.submit(run_task, task, state, models, preferences): task
             for task in batch
@@ -1001,11 +1391,11 @@ def run_pipeline(
 ) -> None:
     """Run all READY tasks in dependency order. Independent tasks run in parallel."""
     total = len(state.tasks)
-    done_count = sum(1 for t in state.tasks if t.state in (TaskState.DONE, TaskState.ARCHIVED))
+    done = done_count(count_task_states(state))
 
     console.print(Panel(
         f"Project: [bold]{state.project_name}[/bold] ({state.version})\n"
-        f"Tasks: {done_count}/{total} complete",
+        f"Tasks: {done}/{total} complete",
         title="[bold]nova run[/bold]",
         border_style="green",
     ))
@@ -1053,7 +1443,7 @@ def run_pipeline(
                 console.print(f", [red]{failed} failed[/red]")
                 failed_ids = [tid for tid, ok in results.items() if not ok]
                 for tid in failed_ids:
-                    t = next(t for t in state.tasks if t.id == tid)
+                    t = get_task(state, tid)
                     console.print(f"  [red]• {tid}: {t.blocked_reason or 'failed'}[/red]")
             else:
                 console.print()
@@ -1062,14 +1452,14 @@ def run_pipeline(
                 console.print("\n[yellow]All tasks in batch failed. Fix issues and re-run.[/yellow]")
                 break
 
-        done_count = sum(1 for t in state.tasks if t.state in (TaskState.DONE, TaskState.ARCHIVED))
-        remaining = total - done_count
+        done = done_count(count_task_states(state))
+        remaining = total - done
 
         if remaining == 0:
             continue
 
         console.print()
-        console.print(f"[dim]{done_count}/{total} tasks done, {remaining} remaining[/dim]")
+        console.print(f"[dim]{done}/{total} tasks done, {remaining} remaining[/dim]")
 
         try:
             answer = console.input("\n[bold]Continue to next batch? [Y/n/q]: [/bold]").strip().lower()
@@ -1088,97 +1478,161 @@ def run_pipeline(
 
 def _load_all_run_logs(project_name: str) -> list[RunLog]:
     """Load every run log for a project."""
+    flush_run_logs()
     logs_dir = get_project_logs(project_name) / "runs"
-    if not logs_dir.exists():
+    try:
+        # Names and file types come with the directory listing, so no
+        # per-file stat is needed to filter.
+        with os.scandir(logs_dir) as it:
+            paths = [e.path for e in sorted(
+                (e for e in it if e.name.endswith(".json") and e.is_file()),
+                key=attrgetter("name"),
+            )]
+    except FileNotFoundError:
+        return []
+    if not paths:
         return []
+    # Reads and JSON parsing release the GIL, so overlap them; map() keeps
+    # the sorted order.
+    with ThreadPoolExecutor(max_workers=min(len(paths), READ_WORKERS)) as executor:
+        return [log for log in executor.map(_read_run_log, paths) if log is not None]
 
-    logs: list[RunLog] = []
-    for path in sorted(logs_dir.glob("*.json")):
-        try:
-            data = json.loads(path.read_text())
-            logs.append(RunLog.model_validate(data))
-        except (json.JSONDecodeError, Exception):
-            continue
-    return logs
+
+# Lessons are cached in paths.LESSONS_INDEX as file name -> [mtime_ns, size,
+# first LESSON_PREVIEW_CHARS of the stripped text]. Only files whose
+# signature changed since the last Distiller run are re-read.
+LESSON_PREVIEW_CHARS = 200
 
 
 def _load_existing_lessons() -> list[str]:
-    """Load existing lessons from the knowledge base to avoid duplicates."""
-    from nova.paths import KNOWLEDGE_DIR
+    """Load existing lessons from the knowledge base to avoid duplicates.
+
+    Each lesson is truncated to LESSON_PREVIEW_CHARS, which is all the
+    Distiller context shows of it.
+    """
+    from nova.paths import KNOWLEDGE_DIR, LESSONS_INDEX
     lessons_dir = KNOWLEDGE_DIR / "lessons"
-    if not lessons_dir.exists():
+    try:
+        with os.scandir(lessons_dir) as it:
+            entries = sorted(
+                (e.name, e.stat()) for e in it if e.name.endswith(".md") and e.is_file()
+            )
+    except FileNotFoundError:
         return []
 
+    index = _load_json_index(LESSONS_INDEX)
+    manifest: dict[str, list] = {}
     existing: list[str] = []
-    for f in sorted(lessons_dir.glob("*.md")):
-        existing.append(f.read_text().strip())
+    changed = len(index) != len(entries)
+    for name, st in entries:
+        cached = index.get(name)
+        if cached and cached[:2] == [st.st_mtime_ns, st.st_size]:
+            text = cached[2]
+        else:
+            changed = True
+            try:
+                with open(os.path.join(lessons_dir, name)) as f:
+                    text = f.read().strip()[:LESSON_PREVIEW_CHARS]
+            except (OSError, ValueError):
+                continue  # unreadable lesson; skip it rather than fail the Distiller
+        manifest[name] = [st.st_mtime_ns, st.st_size, text]
+        existing.append(text)
+
+    if changed:
+        try:
+            _save_json_index(LESSONS_INDEX, manifest)
+        except OSError:
+            pass  # only a cache
     return existing
 
 
+_STATUS_ICONS = {TaskState.DONE: "✓", TaskState.BLOCKED: "✗"}
+
+# Failed/blocked invocations listed in the Distiller context; only the most
+# recent are kept.
+DISTILLER_MAX_FAILED_LOGS = 50
+
+
 def _build_distiller_context(
     state: ProjectState,
     run_logs: list[RunLog],
     existing_lessons: list[str],
 ) -> str:
     """Build the full context block for the Distiller."""
-    parts: list[str] = []
+    # Every line after the first is written with its leading newline.
+    buf = io.StringIO()
+    w = buf.write
 
     # Task summary
-    parts.append("## Task Summary\n")
-    total = len(state.tasks)
-    done = sum(1 for t in state.tasks if t.state in (TaskState.DONE, TaskState.ARCHIVED))
-    blocked = sum(1 for t in state.tasks if t.state == TaskState.BLOCKED)
-    parts.append(f"- Total tasks: {total}")
-    parts.append(f"- Completed: {done}")
-    parts.append(f"- Blocked: {blocked}")
-
-    total_attempts = sum(t.attempt for t in state.tasks)
-    parts.append(f"- Total retry attempts across all tasks: {total_attempts}")
-    parts.append("")
+    counts = count_task_states(state)
+    w("## Task Summary\n")
+    w(f"\n- Total tasks: {len(state.tasks)}")
+    w(f"\n- Completed: {done_count(counts)}")
+    w(f"\n- Blocked: {counts[TaskState.BLOCKED]}")
+    w(f"\n- Total retry attempts across all tasks: {sum(t.attempt for t in state.tasks)}\n")
 
     for t in state.tasks:
-        status_icon = "✓" if t.state == TaskState.DONE else "✗" if t.state == TaskState.BLOCKED else "?"
-        parts.append(f"- [{status_icon}] {t.id}: {t.title} (attempts: {t.attempt}, state: {t.state.value})")
+        icon = _STATUS_ICONS.get(t.state, "?")
+        w(f"\n- [{icon}] {t.id}: {t.title} (attempts: {t.attempt}, state: {t.state.value})")
         if t.blocked_reason:
-            parts.append(f"  Blocked: {t.blocked_reason}")
+            w(f"\n  Blocked: {t.blocked_reason}")
 
     # Escalation summary
     if state.escalations:
-        parts.append("\n## Escalations\n")
+        w("\n\n## Escalations\n")
         for esc in state.escalations:
             resolved = "resolved" if esc.resolved else "unresolved"
-            parts.append(f"- {esc.id}: {esc.reason} [{resolved}]")
+            w(f"\n- {esc.id}: {esc.reason} [{resolved}]")
             if esc.resolution:
-                parts.append(f"  Resolution: {esc.resolution}")
+                w(f"\n  Resolution: {esc.resolution}")
 
     # Run log summary (aggregate, not every line)
     if run_logs:
-        parts.append("\n## Run Log Summary\n")
-        total_input = sum(l.token_usage.get("input", 0) for l in run_logs)
-        total_output = sum(l.token_usage.get("output", 0) for l in run_logs)
-        total_duration = sum(l.duration_ms for l in run_logs)
-        parts.append(f"- Total API calls: {len(run_logs)}")
-        parts.append(f"- Total tokens: ~{total_input:,} input, ~{total_output:,} output")
-        parts.append(f"- Total duration: {total_duration / 1000:.1f}s")
-
-        role_counts: dict[str, int] = {}
+        # One pass over the logs for every aggregate below.
+        total_input = total_output = total_duration = 0
+        role_counts: Counter[str] = Counter()
+        # The most recent failures as (timestamp, seq, line), a min-heap
+        # bounded to DISTILLER_MAX_FAILED_LOGS. Run logs are loaded in
+        # filename order, which isn't chronological.
+        failed: list[tuple[str, int, str]] = []
+        failed_total = 0
         for l in run_logs:
-            role_counts[l.role.value] = role_counts.get(l.role.value, 0) + 1
-        parts.append(f"- Calls by role: {', '.join(f'{r}: {c}' for r, c in sorted(role_counts.items()))}")
-
-        failed_logs = [l for l in run_logs if l.status != AgentStatus.COMPLETE]
-        if failed_logs:
-            parts.append(f"\n### Failed/Blocked Invocations ({len(failed_logs)}):\n")
-            for l in failed_logs:
-                parts.append(f"- {l.task_id} / {l.role.value} (attempt {l.attempt}): {l.summary[:150]}")
+            usage = l.token_usage
+            total_input += usage.get("input", 0)
+            total_output += usage.get("output", 0)
+            total_duration += l.duration_ms
+            role_counts[l.role.value] += 1
+            if l.status != AgentStatus.COMPLETE:
+                entry = (
+                    l.timestamp,
+                    failed_total,
+                    f"\n- {l.task_id} / {l.role.value} (attempt {l.attempt}): {l.summary[:150]}",
+                )
+                failed_total += 1
+                if len(failed) < DISTILLER_MAX_FAILED_LOGS:
+                    heapq.heappush(failed, entry)
+                elif entry > failed[0]:
+                    heapq.heapreplace(failed, entry)
+
+        w("\n\n## Run Log Summary\n")
+        w(f"\n- Total API calls: {len(run_logs)}")
+        w(f"\n- Total tokens: ~{total_input:,} input, ~{total_output:,} output")
+        w(f"\n- Total duration: {total_duration / 1000:.1f}s")
+        w(f"\n- Calls by role: {', '.join(f'{r}: {c}' for r, c in sorted(role_counts.items()))}")
+
+        if failed:
+            shown = "" if failed_total == len(failed) else f", latest {len(failed)} shown"
+            w(f"\n\n### Failed/Blocked Invocations ({failed_total}{shown}):\n")
+            for _, _, line in sorted(failed):
+                w(line)
 
     # Existing lessons
     if existing_lessons:
-        parts.append("\n## Existing Lessons (do NOT duplicate)\n")
+        w("\n\n## Existing Lessons (do NOT duplicate)\n")
         for i, lesson in enumerate(existing_lessons, 1):
-            parts.append(f"{i}. {lesson[:200]}")
+            w(f"\n{i}. {lesson[:LESSON_PREVIEW_CHARS]}")
 
-    return "\n".join(parts)
+    return buf.getvalue()
 
 
 def run_distiller(
@@ -1,10 +1,12 @@
 """Interactive chat session engine for Planner conversations."""
 
-import json
+import os
+import re
 from collections.abc import Callable
 from datetime import datetime, timezone
 from pathlib import Path
 
+from pydantic_core import from_json, to_json
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
@@ -26,6 +28,14 @@ TRANSITION_KEYWORDS: dict[str, str] = {
     "ready for tasks": "ready_for_tasks",
 }
 
+# All keywords in one pattern, longest first, as whole words/phrases only, so
+# "I disapprove" isn't read as "approve".
+_TRANSITION_RE = re.compile(
+    r"\b(?:"
+    + "|".join(map(re.escape, sorted(TRANSITION_KEYWORDS, key=len, reverse=True)))
+    + r")\b"
+)
+
 
 # ---------------------------------------------------------------------------
 # Session persistence
@@ -44,7 +54,11 @@ def save_session(
 ) -> Path:
     path = _session_path(project_name, phase, version, logs_dir)
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(messages, indent=2))
+    # Compact, and swapped in whole so a crash mid-write can't leave a
+    # truncated history behind.
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(to_json(messages))
+    os.replace(tmp_path, path)
     return path
 
 
@@ -55,9 +69,11 @@ def load_session(
     logs_dir: Path,
 ) -> list[dict[str, str]]:
     path = _session_path(project_name, phase, version, logs_dir)
-    if not path.exists():
+    try:
+        with open(path, "rb") as f:
+            return from_json(f.read())
+    except FileNotFoundError:
         return []
-    return json.loads(path.read_text())
 
 
 # ---------------------------------------------------------------------------
@@ -69,9 +85,13 @@ def detect_transition(user_input: str) -> str | None:
 
     Returns the transition action string or None.
     """
-    lower = user_input.strip().lower()
+    found = set(_TRANSITION_RE.findall(user_input.lower()))
+    if not found:
+        return None
+    # Several keywords can appear in one message; the first one in
+    # TRANSITION_KEYWORDS order wins.
     for keyword, action in TRANSITION_KEYWORDS.items():
-        if keyword in lower:
+        if keyword in found:
             return action
     return None
 
@@ -80,6 +100,49 @@ def detect_transition(user_input: str) -> str | None:
 # Chat loop
 # ---------------------------------------------------------------------------
 
+def _write_chunk(chunk: str) -> None:
+    """Write streamed model text straight to the terminal.
+
+    Model output is plain text, so it skips Rich's markup parsing (which
+    would also eat anything that looks like [tag]); one write per batch.
+    """
+    out = console.file
+    out.write(chunk)
+    out.flush()
+
+
+def _stream_planner_turn(
+    system_prompt: str,
+    model_config: ModelConfig,
+    messages: list[dict[str, str]],
+) -> str:
+    """Stream the Planner's reply to the terminal and append it to messages."""
+    console.print()
+    console.print("[bold green]nova (planner):[/bold green]")
+
+    gen = call_agent_stream(
+        role=AgentRole.PLANNER,
+        system_prompt=system_prompt,
+        model_config=model_config,
+        messages=messages,
+    )
+
+    chunks: list[str] = []
+    try:
+        while True:
+            chunk = next(gen)
+            _write_chunk(chunk)
+            chunks.append(chunk)
+    except StopIteration as e:
+        full_response_final, _ = e.value
+    full_response = full_response_final or "".join(chunks)
+
+    console.print()
+
+    messages.append({"role": "assistant", "content": full_response})
+    return full_response
+
+
 def run_chat_session(
     project_name: str,
     phase: str,
@@ -134,30 +197,7 @@ def run_chat_session(
         if initial_message:
             messages.append({"role": "user", "content": initial_message})
 
-            console.print()
-            console.print("[bold green]nova (planner):[/bold green]")
-
-            gen = call_agent_stream(
-                role=AgentRole.PLANNER,
-                system_prompt=system_prompt,
-                model_config=model_config,
-                messages=messages,
-            )
-
-            full_response = ""
-            try:
-                while True:
-                    chunk = next(gen)
-                    console.print(chunk, end="", highlight=False)
-                    full_response += chunk
-            except StopIteration as e:
-                full_response_final, usage_meta = e.value
-                if full_response_final:
-                    full_response = full_response_final
-
-            console.print()
-
-            messages.append({"role": "assistant", "content": full_response})
+            _stream_planner_turn(system_prompt, model_config, messages)
             save_session(messages, project_name, phase, version, logs_dir)
 
     while True:
@@ -190,30 +230,7 @@ def run_chat_session(
 
         messages.append({"role": "user", "content": stripped})
 
-        console.print()
-        console.print("[bold green]nova (planner):[/bold green]")
-
-        gen = call_agent_stream(
-            role=AgentRole.PLANNER,
-            system_prompt=system_prompt,
-            model_config=model_config,
-            messages=messages,
-        )
-
-        full_response = ""
-        try:
-            while True:
-                chunk = next(gen)
-                console.print(chunk, end="", highlight=False)
-                full_response += chunk
-        except StopIteration as e:
-            full_response_final, usage_meta = e.value
-            if full_response_final:
-                full_response = full_response_final
-
-        console.print()
-
-        messages.append({"role": "assistant", "content": full_response})
+        _stream_planner_turn(system_prompt, model_config, messages)
         save_session(messages, project_name, phase, version, logs_dir)
 
     return messages
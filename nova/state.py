@@ -1,7 +1,12 @@
 """State machine and persistence for tasks and projects."""
 
+import hashlib
 import json
+import os
 import threading
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 from nova.models import (
@@ -10,6 +15,7 @@ from nova.models import (
     ProjectState,
     Task,
     TaskState,
+    utc_now_iso,
 )
 from nova.paths import get_project_root
 
@@ -31,6 +37,9 @@ TASK_TRANSITIONS: dict[TaskState, set[TaskState]] = {
     TaskState.ARCHIVED:    set(),
 }
 
+# Finished task states; a dependency in one of these is satisfied.
+TERMINAL_STATES: frozenset[TaskState] = frozenset({TaskState.DONE, TaskState.ARCHIVED})
+
 PHASE_TRANSITIONS: dict[ProjectPhase, set[ProjectPhase]] = {
     ProjectPhase.BRAINSTORM:       {ProjectPhase.SPEC_DRAFT},
     ProjectPhase.SPEC_DRAFT:       {ProjectPhase.SPEC_APPROVED},
@@ -51,8 +60,11 @@ def can_transition_task(current: TaskState, target: TaskState) -> bool:
     return target in TASK_TRANSITIONS.get(current, set())
 
 
-def transition_task(task: Task, target: TaskState) -> Task:
-    """Transition a task to a new state. Raises ValueError if invalid."""
+def transition_task(task: Task, target: TaskState, *, now_iso: str | None = None) -> Task:
+    """Transition a task to a new state. Raises ValueError if invalid.
+
+    Pass now_iso to stamp several transitions in a batch with one timestamp.
+    """
     if not can_transition_task(task.state, target):
         raise ValueError(
             f"Invalid task transition: {task.state.value} → {target.value} "
@@ -72,8 +84,7 @@ def transition_task(task: Task, target: TaskState) -> Task:
         task.blocked_reason = None
         task.escalation_id = None
 
-    from datetime import datetime, timezone
-    task.updated_at = datetime.now(timezone.utc).isoformat()
+    task.updated_at = now_iso or utc_now_iso()
     return task
 
 
@@ -81,8 +92,13 @@ def can_transition_phase(current: ProjectPhase, target: ProjectPhase) -> bool:
     return target in PHASE_TRANSITIONS.get(current, set())
 
 
-def transition_phase(state: ProjectState, target: ProjectPhase) -> ProjectState:
-    """Transition a project to a new phase. Raises ValueError if invalid."""
+def transition_phase(
+    state: ProjectState, target: ProjectPhase, *, now_iso: str | None = None
+) -> ProjectState:
+    """Transition a project to a new phase. Raises ValueError if invalid.
+
+    Pass now_iso to stamp several transitions in a batch with one timestamp.
+    """
     if not can_transition_phase(state.phase, target):
         raise ValueError(
             f"Invalid phase transition: {state.phase.value} → {target.value} "
@@ -99,8 +115,7 @@ def transition_phase(state: ProjectState, target: ProjectPhase) -> ProjectState:
 
     state.phase = target
 
-    from datetime import datetime, timezone
-    state.updated_at = datetime.now(timezone.utc).isoformat()
+    state.updated_at = now_iso or utc_now_iso()
     return state
 
 
@@ -109,22 +124,112 @@ def transition_phase(state: ProjectState, target: ProjectPhase) -> ProjectState:
 # ---------------------------------------------------------------------------
 
 def get_task(state: ProjectState, task_id: str) -> Task:
-    for task in state.tasks:
-        if task.id == task_id:
-            return task
-    raise KeyError(f"Task '{task_id}' not found in project '{state.project_name}'")
+    """Look a task up by ID through an index of list positions.
+
+    A position is used only after checking that the task there still has
+    this ID, so the index rebuilds itself when the task list changes.
+    """
+    tasks = state.tasks
+    i = state._task_index.get(task_id)
+    if i is None or i >= len(tasks) or tasks[i].id != task_id:
+        index: dict[str, int] = {}
+        for pos, task in enumerate(tasks):
+            index.setdefault(task.id, pos)
+        state._task_index = index
+        i = index.get(task_id)
+        if i is None:
+            raise KeyError(f"Task '{task_id}' not found in project '{state.project_name}'")
+    return tasks[i]
+
+
+def transitive_dependents(state: ProjectState) -> dict[str, frozenset[str]]:
+    """Map each task ID to the IDs of every task that depends on it, directly or not.
+
+    Built in one pass in reverse topological order (Kahn), so each task's
+    set is the union of its direct dependents' sets and nothing is walked
+    twice. The result is memoized on the state until a task is added,
+    removed or has its dependencies changed.
+    """
+    graph = tuple((t.id, tuple(t.dependencies)) for t in state.tasks)
+    cached = state._dependents_cache
+    if cached and cached[0] == graph:
+        return cached[1]
+
+    task_ids = {task_id for task_id, _ in graph}
+    dependents: dict[str, list[str]] = defaultdict(list)
+    pending = dict.fromkeys(task_ids, 0)
+    for task_id, deps in graph:
+        for dep in set(deps):
+            if dep in task_ids:
+                dependents[dep].append(task_id)
+                pending[task_id] += 1
+
+    order = [task_id for task_id, count in pending.items() if count == 0]
+    for task_id in order:
+        for child in dependents.get(task_id, ()):
+            pending[child] -= 1
+            if pending[child] == 0:
+                order.append(child)
+
+    # Tasks on or behind a dependency cycle never reach in-degree zero; walk
+    # those individually. Everything else is built from its dependents' sets.
+    result: dict[str, frozenset[str]] = {}
+    for task_id in task_ids.difference(order):
+        seen: set[str] = set()
+        stack = list(dependents.get(task_id, ()))
+        while stack:
+            child = stack.pop()
+            if child not in seen:
+                seen.add(child)
+                stack.extend(dependents.get(child, ()))
+        result[task_id] = frozenset(seen)
+
+    for task_id in reversed(order):
+        below: set[str] = set()
+        for child in dependents.get(task_id, ()):
+            below.add(child)
+            below |= result[child]
+        result[task_id] = frozenset(below)
+
+    state._dependents_cache = (graph, result)
+    return result
+
+
+def schedule_weights(state: ProjectState) -> dict[str, int]:
+    """Map each task ID to the number of tasks that transitively depend on it."""
+    return {task_id: len(below) for task_id, below in transitive_dependents(state).items()}
+
+
+def task_priority(state: ProjectState) -> Callable[[Task], tuple[int, int]]:
+    """Sort key for runnable tasks: whatever unblocks the most work first, then by order."""
+    if not any(t.dependencies for t in state.tasks):
+        # No edges, so every weight is zero: order alone decides, and the
+        # dependents walk can be skipped.
+        return lambda t: (0, t.order)
+    weights = schedule_weights(state)
+    return lambda t: (-weights.get(t.id, 0), t.order)
 
 
 def get_next_ready_task(state: ProjectState) -> Task | None:
-    """Return the next READY task by execution order, or None."""
+    """Return the highest-priority READY task (see task_priority), or None."""
     ready = [t for t in state.tasks if t.state == TaskState.READY]
     if not ready:
         return None
-    return sorted(ready, key=lambda t: t.order)[0]
+    return min(ready, key=task_priority(state))
+
+
+def count_task_states(state: ProjectState) -> Counter[TaskState]:
+    """Number of tasks in each state, from a single pass over the task list."""
+    return Counter(t.state for t in state.tasks)
+
+
+def done_count(counts: Counter[TaskState]) -> int:
+    """Tasks that are DONE or ARCHIVED, given count_task_states() output."""
+    return counts[TaskState.DONE] + counts[TaskState.ARCHIVED]
 
 
 def all_tasks_done(state: ProjectState) -> bool:
-    return all(t.state in (TaskState.DONE, TaskState.ARCHIVED) for t in state.tasks)
+    return all(t.state in TERMINAL_STATES for t in state.tasks)
 
 
 # ---------------------------------------------------------------------------
@@ -135,11 +240,138 @@ def _state_file(project_name: str) -> Path:
     return get_project_root(project_name) / "state.json"
 
 
-def save_state(state: ProjectState) -> Path:
-    with _state_lock:
-        path = _state_file(state.project_name)
-        path.write_text(state.model_dump_json(indent=2))
+# Task changes between full saves are appended here as one JSON line per
+# saved task, after a header line naming the state.json checkpoint
+# ((mtime_ns, size)) they apply on top of. load_state replays them; a
+# journal whose header doesn't match state.json predates the current
+# checkpoint and is ignored.
+def _journal_file(project_name: str) -> Path:
+    return get_project_root(project_name) / "state.log.ndjson"
+
+
+# Task records appended before save_task writes a full checkpoint instead.
+JOURNAL_CHECKPOINT_INTERVAL = 25
+
+
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _write_state(state: ProjectState, force: bool = False) -> Path:
+    # Caller holds _state_lock.
+    path = _state_file(state.project_name)
+    data = state.model_dump_json(indent=2).encode()
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    # Skip the write if this exact dump is what the file already holds (and
+    # nobody has touched the file since). Any journal is then redundant but
+    # still valid, so it is left alone.
+    if not force and state._last_dump == (digest, _file_signature(path)):
         return path
+    path.write_bytes(data)
+    _journal_file(state.project_name).unlink(missing_ok=True)
+    state._journal_records = 0
+    state._last_dump = (digest, _file_signature(path))
+    return path
+
+
+def save_state(state: ProjectState, force: bool = False) -> Path:
+    """Write the state to disk, or mark it for writing if saves are deferred.
+
+    The write is skipped when nothing changed since the last one, unless force is set.
+    """
+    with _state_lock:
+        if state._save_depth:
+            state._save_pending = True
+            return _state_file(state.project_name)
+        return _write_state(state, force)
+
+
+def save_task(state: ProjectState, task: Task) -> Path:
+    """Persist a change that only touched this task.
+
+    The task is appended to the state journal, which costs the size of one
+    task rather than a rewrite of the whole state. Every
+    JOURNAL_CHECKPOINT_INTERVAL records a full save_state checkpoint is
+    written instead, which also clears the journal.
+    """
+    with _state_lock:
+        if state._save_depth:
+            state._save_pending = True
+            return _state_file(state.project_name)
+        if state._journal_records >= JOURNAL_CHECKPOINT_INTERVAL:
+            return _write_state(state)
+
+        journal = _journal_file(state.project_name)
+        if state._journal_records:
+            mode, data = "ab", b""
+        else:
+            try:
+                st = os.stat(_state_file(state.project_name))
+            except FileNotFoundError:
+                return _write_state(state)
+            mode, data = "wb", json.dumps({"checkpoint": [st.st_mtime_ns, st.st_size]}).encode() + b"\n"
+        with open(journal, mode) as f:
+            f.write(data + task.model_dump_json().encode() + b"\n")
+        state._journal_records += 1
+        return journal
+
+
+def _replay_journal(state: ProjectState, state_path: Path) -> None:
+    """Apply journaled task records written since state_path's checkpoint."""
+    try:
+        lines = _journal_file(state.project_name).read_bytes().splitlines()
+    except FileNotFoundError:
+        return
+    if not lines:
+        return
+    st = os.stat(state_path)
+    try:
+        header = json.loads(lines[0])
+    except ValueError:
+        return
+    if not isinstance(header, dict) or header.get("checkpoint") != [st.st_mtime_ns, st.st_size]:
+        return
+
+    index = {t.id: i for i, t in enumerate(state.tasks)}
+    replayed = 0
+    for line in lines[1:]:
+        try:
+            task = Task.model_validate_json(line)
+        except ValueError:
+            # A record torn by a crash mid-append. Nothing can be appended
+            # after it, so make the next save a full checkpoint.
+            replayed = JOURNAL_CHECKPOINT_INTERVAL
+            break
+        i = index.get(task.id)
+        if i is not None:
+            state.tasks[i] = task
+        replayed += 1
+    state._journal_records = replayed
+
+
+@contextmanager
+def deferred_saves(state: ProjectState) -> Iterator[ProjectState]:
+    """Collapse every save_state call inside the block into one write at the end.
+
+    Blocks can nest; the write happens when the outermost one exits, even on
+    an exception, and only if something asked to save.
+    """
+    with _state_lock:
+        state._save_depth += 1
+    try:
+        yield state
+    finally:
+        with _state_lock:
+            state._save_depth -= 1
+            flush = state._save_depth == 0 and state._save_pending
+            if flush:
+                state._save_pending = False
+        if flush:
+            save_state(state)
 
 
 def load_state(project_name: str) -> ProjectState:
@@ -150,7 +382,9 @@ def load_state(project_name: str) -> ProjectState:
             f"Run 'nova new {project_name}' first."
         )
     data = json.loads(path.read_text())
-    return ProjectState.model_validate(data)
+    state = ProjectState.model_validate(data)
+    _replay_journal(state, path)
+    return state
 
 
 def init_state(project_name: str, version: str = "v1") -> ProjectState:
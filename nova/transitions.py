@@ -1,122 +1,294 @@
 """Phase transition handling — document locking, state changes, task parsing."""
 
-import json
+import io
+import os
+import re
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, NamedTuple
 
+from pydantic_core import from_json, to_json
 from rich.console import Console
-from rich.panel import Panel
 
 from nova.agent import _extract_json
 from nova.models import ProjectPhase, ProjectState, Task, TaskState
 from nova.paths import get_project_docs
 from nova.state import save_state, transition_phase
 
-console = Console()
+
+@lru_cache(maxsize=1)
+def _console() -> Console:
+    """The module's Rich console, created on first output.
+
+    Importing transitions (tests, scripts) then doesn't build a console it
+    may never print to.
+    """
+    return Console()
 
 
 # ---------------------------------------------------------------------------
 # Document extraction from conversation
 # ---------------------------------------------------------------------------
 
+# Assistant messages, counting back from the latest, that are searched for
+# the document. Specs and plans are virtually always among the last few turns.
+_MAX_LOOKBACK = 20
+
+# (messages list, its length, concatenated notes). Chat sessions only ever
+# append to the message list, so the same list at the same length has the
+# same content; holding a reference keeps the identity check sound. Holds the
+# whole transcript, so handle_transition clears it when it's done.
+_all_content_cache: tuple[list[dict[str, str]], int, str] | None = None
+
+
+def _is_substantial(msg: str) -> bool:
+    # The cheap length test first. The header may sit anywhere in the
+    # message (a spec can open with a long preamble), so the whole message
+    # is searched; "in" is a single C-level scan.
+    return len(msg) > 300 and "## " in msg
+
+
 def _get_last_substantial_assistant_message(messages: list[dict[str, str]]) -> str:
     """Get the last substantial assistant response — the actual document, not a short acknowledgment.
 
     Walks backwards through messages looking for an assistant message that
     contains markdown headers (##) and is reasonably long. Falls back to the
-    longest assistant message if no header-based match is found.
+    longest assistant message if no header-based match is found. Only the
+    last _MAX_LOOKBACK assistant messages are considered.
     """
-    assistant_msgs = [m["content"] for m in messages if m["role"] == "assistant"]
-    if not assistant_msgs:
-        return ""
-
-    for msg in reversed(assistant_msgs):
-        if "## " in msg and len(msg) > 300:
+    # Track the longest message on the way, so the fallback needs no second
+    # walk; on a tie, the latest wins.
+    best = ""
+    seen = 0
+    for m in reversed(messages):
+        if m["role"] != "assistant":
+            continue
+        msg = m["content"]
+        if _is_substantial(msg):
             return msg
+        if len(msg) > len(best):
+            best = msg
+        seen += 1
+        if seen == _MAX_LOOKBACK:
+            break
+    return best
+
 
-    return max(assistant_msgs, key=len)
+_SPEAKER_PREFIX = {"user": "**Human:** ", "assistant": "**Planner:** "}
 
 
 def _get_all_assistant_content(messages: list[dict[str, str]]) -> str:
     """Concatenate all assistant messages for brainstorm notes."""
-    parts = []
-    for i, msg in enumerate(messages):
-        if msg["role"] == "user":
-            parts.append(f"**Human:** {msg['content']}")
-        elif msg["role"] == "assistant":
-            parts.append(f"**Planner:** {msg['content']}")
-    return "\n\n---\n\n".join(parts)
+    global _all_content_cache
+
+    cached = _all_content_cache
+    if cached and cached[0] is messages and cached[1] == len(messages):
+        return cached[2]
+
+    # Written straight into one buffer rather than formatting every part
+    # and joining them, which held the whole transcript twice.
+    buf = io.StringIO()
+    w = buf.write
+    sep = ""
+    for m in messages:
+        prefix = _SPEAKER_PREFIX.get(m["role"])
+        if prefix is None:
+            continue
+        w(sep)
+        w(prefix)
+        w(str(m["content"]))
+        sep = "\n\n---\n\n"
+    content = buf.getvalue()
+    _all_content_cache = (messages, len(messages), content)
+    return content
+
+
+def _clear_message_caches() -> None:
+    global _all_content_cache
+    _all_content_cache = None
 
 
 # ---------------------------------------------------------------------------
 # Document saving
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=64)
+def _doc_dir(project_name: str, subdir: str) -> Path:
+    """A project's docs subdirectory, composed once per (project, subdir)."""
+    return get_project_docs(project_name) / subdir
+
+
+# Directories already created by this process, so repeated saves skip mkdir.
+_made_dirs: set[Path] = set()
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+
+
+def _ensure_dir(path: Path) -> None:
+    if path not in _made_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _made_dirs.add(path)
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """Write pre-encoded data to path atomically.
+
+    The bytes go to a sibling temp file (one open, as few write calls as
+    the OS allows) that then replaces path, so a crash mid-save leaves the
+    previous version intact rather than a truncated one. Nothing is written
+    if the file already holds exactly these bytes, e.g. when the same
+    document is approved twice.
+    """
+    try:
+        if os.stat(path).st_size == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return
+    except FileNotFoundError:
+        pass
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        fd = os.open(tmp_path, _WRITE_FLAGS, 0o666)
+    except FileNotFoundError:
+        # The directory was removed since we created it.
+        _made_dirs.discard(path.parent)
+        _ensure_dir(path.parent)
+        fd = os.open(tmp_path, _WRITE_FLAGS, 0o666)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def _save_brainstorm_notes(messages: list[dict[str, str]], state: ProjectState) -> Path:
-    docs = get_project_docs(state.project_name)
-    path = docs / "brainstorm" / f"{state.version}-notes.md"
-    path.parent.mkdir(parents=True, exist_ok=True)
+    path = _doc_dir(state.project_name, "brainstorm") / f"{state.version}-notes.md"
+    _ensure_dir(path.parent)
 
     content = f"# Brainstorm Notes — {state.project_name} ({state.version})\n\n"
     content += _get_all_assistant_content(messages)
-    path.write_text(content)
+    _write_file(path, content.encode())
     return path
 
 
 def _save_spec(messages: list[dict[str, str]], state: ProjectState) -> Path:
-    docs = get_project_docs(state.project_name)
-    path = docs / "spec" / f"{state.version}.md"
-    path.parent.mkdir(parents=True, exist_ok=True)
+    path = _doc_dir(state.project_name, "spec") / f"{state.version}.md"
+    _ensure_dir(path.parent)
 
     spec_content = _get_last_substantial_assistant_message(messages)
     content = f"# Spec — {state.project_name} ({state.version})\n\n{spec_content}"
-    path.write_text(content)
+    _write_file(path, content.encode())
     return path
 
 
 def _save_plan(messages: list[dict[str, str]], state: ProjectState) -> Path:
-    docs = get_project_docs(state.project_name)
-    path = docs / "plans" / f"{state.version}.md"
-    path.parent.mkdir(parents=True, exist_ok=True)
+    path = _doc_dir(state.project_name, "plans") / f"{state.version}.md"
+    _ensure_dir(path.parent)
 
     plan_content = _get_last_substantial_assistant_message(messages)
     content = f"# Plan — {state.project_name} ({state.version})\n\n{plan_content}"
-    path.write_text(content)
+    _write_file(path, content.encode())
     return path
 
 
+_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+# \uD800-\uDFFF escapes that aren't part of a valid pair; some models emit
+# them and the JSON parser rejects the whole document.
+_LONE_SURROGATE_RE = re.compile(
+    r"\\u[dD][89abAB][0-9a-fA-F]{2}(?!\\u[dD][c-fC-F][0-9a-fA-F]{2})"
+    r"|(?<!\\u[dD][89abAB][0-9a-fA-F]{2})\\u[dD][c-fC-F][0-9a-fA-F]{2}"
+)
+
+
+def _parse_task_json(text: str) -> tuple[Any, str | None]:
+    """Parse the Planner's task list, trying the cheapest reading first.
+
+    The whole response as JSON, then a fenced or embedded object, then a
+    bare array in prose. If all fail and the text has lone surrogate
+    escapes, they are dropped and parsing is retried once. Raises ValueError.
+
+    Returns the parsed value and, when known, the exact JSON text it came
+    from.
+    """
+    try:
+        data = from_json(text)
+    except ValueError:
+        pass
+    else:
+        # A bare scalar reply ("ok", 42, null) is no task list; keep looking.
+        if isinstance(data, (list, dict)):
+            return data, text.strip()
+    data = error = None
+    try:
+        data = _extract_json(text)
+    except ValueError as e:
+        error = e
+    else:
+        if not isinstance(data, dict) or "tasks" in data:
+            return data, None
+        # An object without "tasks" is likely one element of a bare array.
+    match = _ARRAY_RE.search(text)
+    if match:
+        try:
+            return from_json(match.group(0)), match.group(0)
+        except ValueError:
+            pass
+    if data is not None:
+        return data, None
+    cleaned = _LONE_SURROGATE_RE.sub("", text)
+    if cleaned != text:
+        return _parse_task_json(cleaned)
+    raise error
+
+
 def _save_and_parse_tasks(messages: list[dict[str, str]], state: ProjectState) -> Path:
     """Parse task JSON from the Planner's response and save to state + file."""
-    docs = get_project_docs(state.project_name)
-    path = docs / "tasks" / f"{state.version}.tasks.json"
-    path.parent.mkdir(parents=True, exist_ok=True)
+    path = _doc_dir(state.project_name, "tasks") / f"{state.version}.tasks.json"
+    _ensure_dir(path.parent)
 
     last_response = _get_last_substantial_assistant_message(messages)
 
     try:
-        task_data = _extract_json(last_response)
-    except (ValueError, json.JSONDecodeError):
+        task_data, source = _parse_task_json(last_response)
+        if not isinstance(task_data, (list, dict)):
+            raise ValueError("Task JSON is neither a list nor an object")
+    except ValueError:
+        console = _console()
         console.print("[red]Error:[/red] Could not parse task JSON from Planner's response.")
         console.print("[yellow]Ask the Planner to regenerate the task list in JSON format.[/yellow]")
         return path
 
     task_list = task_data if isinstance(task_data, list) else task_data.get("tasks", [])
 
-    tasks: list[Task] = []
-    for item in task_list:
-        task = Task(
+    version = state.version
+    new = TaskState.NEW
+    # Empty tuples as defaults: validation copies them into fresh lists anyway.
+    state.tasks = [
+        Task(
             id=item["id"],
             title=item["title"],
             description=item.get("description", ""),
-            acceptance_criteria=item.get("acceptance_criteria", []),
-            order=item.get("order", len(tasks) + 1),
-            dependencies=item.get("dependencies", []),
-            version=state.version,
-            state=TaskState.NEW,
+            acceptance_criteria=item.get("acceptance_criteria", ()),
+            order=item.get("order", i),
+            dependencies=item.get("dependencies", ()),
+            version=version,
+            state=new,
         )
-        tasks.append(task)
-
-    state.tasks = tasks
-    path.write_text(json.dumps(task_list, indent=2))
+        for i, item in enumerate(task_list, 1)
+    ]
+    if source is not None and task_list is task_data:
+        # The response was the task array itself: save it as written rather
+        # than re-serializing what was just parsed.
+        _write_file(path, source.encode())
+    else:
+        _write_file(path, to_json(task_list, indent=2))
 
     return path
 
@@ -125,50 +297,58 @@ def _save_and_parse_tasks(messages: list[dict[str, str]], state: ProjectState) -
 # Transition mapping
 # ---------------------------------------------------------------------------
 
-PHASE_ACTIONS: dict[tuple[ProjectPhase, str], dict] = {
+class PhaseAction(NamedTuple):
+    save_fn: Callable[[list[dict[str, str]], ProjectState], Path] | None
+    target_phase: ProjectPhase | None
+    message: str
+    next_command: str                                # shown as "nova <cmd> <project> --version <v>"
+
+
+# Keyed by (phase value, action): plain strings hash faster than enum members.
+PHASE_ACTIONS: dict[tuple[str, str], PhaseAction] = {
     # Brainstorm phase
-    (ProjectPhase.BRAINSTORM, "approved"): {
-        "save_fn": _save_brainstorm_notes,
-        "target_phase": ProjectPhase.SPEC_DRAFT,
-        "message": "Brainstorm notes saved. Moving to spec creation.",
-        "next_hint": "nova spec {project} --version {version}",
-    },
-    (ProjectPhase.BRAINSTORM, "ready_for_spec"): {
-        "save_fn": _save_brainstorm_notes,
-        "target_phase": ProjectPhase.SPEC_DRAFT,
-        "message": "Brainstorm notes saved. Moving to spec creation.",
-        "next_hint": "nova spec {project} --version {version}",
-    },
+    (ProjectPhase.BRAINSTORM.value, "approved"): PhaseAction(
+        save_fn=_save_brainstorm_notes,
+        target_phase=ProjectPhase.SPEC_DRAFT,
+        message="Brainstorm notes saved. Moving to spec creation.",
+        next_command="spec",
+    ),
+    (ProjectPhase.BRAINSTORM.value, "ready_for_spec"): PhaseAction(
+        save_fn=_save_brainstorm_notes,
+        target_phase=ProjectPhase.SPEC_DRAFT,
+        message="Brainstorm notes saved. Moving to spec creation.",
+        next_command="spec",
+    ),
 
     # Spec phase
-    (ProjectPhase.SPEC_DRAFT, "approved"): {
-        "save_fn": _save_spec,
-        "target_phase": ProjectPhase.SPEC_APPROVED,
-        "message": "Spec approved and locked. Ready to create a plan.",
-        "next_hint": "nova plan {project} --version {version}",
-    },
+    (ProjectPhase.SPEC_DRAFT.value, "approved"): PhaseAction(
+        save_fn=_save_spec,
+        target_phase=ProjectPhase.SPEC_APPROVED,
+        message="Spec approved and locked. Ready to create a plan.",
+        next_command="plan",
+    ),
 
     # Plan phase (entered via SPEC_APPROVED → PLAN_DRAFT by the CLI command)
-    (ProjectPhase.PLAN_DRAFT, "approved"): {
-        "save_fn": _save_plan,
-        "target_phase": ProjectPhase.PLAN_APPROVED,
-        "message": "Plan approved and locked. Ready to generate tasks.",
-        "next_hint": "nova tasks {project} --version {version}",
-    },
-    (ProjectPhase.PLAN_DRAFT, "ready_for_tasks"): {
-        "save_fn": _save_plan,
-        "target_phase": ProjectPhase.PLAN_APPROVED,
-        "message": "Plan approved and locked. Ready to generate tasks.",
-        "next_hint": "nova tasks {project} --version {version}",
-    },
+    (ProjectPhase.PLAN_DRAFT.value, "approved"): PhaseAction(
+        save_fn=_save_plan,
+        target_phase=ProjectPhase.PLAN_APPROVED,
+        message="Plan approved and locked. Ready to generate tasks.",
+        next_command="tasks",
+    ),
+    (ProjectPhase.PLAN_DRAFT.value, "ready_for_tasks"): PhaseAction(
+        save_fn=_save_plan,
+        target_phase=ProjectPhase.PLAN_APPROVED,
+        message="Plan approved and locked. Ready to generate tasks.",
+        next_command="tasks",
+    ),
 
     # Tasks phase (Planner has produced tasks, human reviews)
-    (ProjectPhase.TASKS_GENERATED, "approved"): {
-        "save_fn": _save_and_parse_tasks,
-        "target_phase": None,
-        "message": "Tasks approved and locked. Ready to execute.",
-        "next_hint": "nova run {project} --version {version}",
-    },
+    (ProjectPhase.TASKS_GENERATED.value, "approved"): PhaseAction(
+        save_fn=_save_and_parse_tasks,
+        target_phase=None,
+        message="Tasks approved and locked. Ready to execute.",
+        next_command="run",
+    ),
 }
 
 
@@ -185,43 +365,46 @@ def handle_transition(
 
     Called by the session chat loop when a transition keyword is detected.
     """
-    key = (state.phase, action)
+    key = (state.phase.value, action)
+    config = PHASE_ACTIONS.get(key)
 
-    if key not in PHASE_ACTIONS:
-        console.print(
+    if config is None:
+        _console().print(
             f"[yellow]Cannot transition with '{action}' during {state.phase.value} phase.[/yellow]"
         )
         return False
 
-    config = PHASE_ACTIONS[key]
-
     # Save the document artifact
-    if config["save_fn"]:
-        path = config["save_fn"](messages, state)
-        console.print(f"[dim]Saved: {path.name}[/dim]")
+    if config.save_fn:
+        try:
+            path = config.save_fn(messages, state)
+        finally:
+            _clear_message_caches()
+        _console().print(f"[dim]Saved: {path.name}[/dim]")
 
     # Transition the project phase
-    if config["target_phase"]:
-        transition_phase(state, config["target_phase"])
+    if config.target_phase:
+        transition_phase(state, config.target_phase)
 
     # Special handling for task approval
-    if key == (ProjectPhase.TASKS_GENERATED, "approved"):
+    if key == (ProjectPhase.TASKS_GENERATED.value, "approved"):
         state.tasks_approved = True
+        new, ready = TaskState.NEW, TaskState.READY
         for task in state.tasks:
-            if task.state == TaskState.NEW:
-                task.state = TaskState.READY
+            if task.state is new:  # enum members are singletons
+                task.state = ready
 
     save_state(state)
 
     # Display result
-    next_hint = config["next_hint"].format(
-        project=state.project_name,
-        version=state.version,
-    )
+    next_hint = f"nova {config.next_command} {state.project_name} --version {state.version}"
+    from rich.panel import Panel
+
+    console = _console()
     console.print()
     console.print(
         Panel(
-            f"{config['message']}\n\n"
+            f"{config.message}\n\n"
             f"Next: [bold]{next_hint}[/bold]",
             title="[bold]nova[/bold]",
             border_style="green",
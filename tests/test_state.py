@@ -0,0 +1,127 @@
+"""Tests for the state journal: save_task appends, load_state replays."""
+
+import json
+
+import pytest
+
+from nova import state as state_mod
+from nova.models import ProjectState, Task, TaskState
+from nova.state import (
+    JOURNAL_CHECKPOINT_INTERVAL,
+    load_state,
+    save_state,
+    save_task,
+    transition_task,
+)
+
+PROJECT = "demo"
+
+
+@pytest.fixture
+def project_root(tmp_path, monkeypatch):
+    root = tmp_path / PROJECT
+    root.mkdir()
+    monkeypatch.setattr(state_mod, "get_project_root", lambda name: tmp_path / name)
+    return root
+
+
+@pytest.fixture
+def state(project_root):
+    state = ProjectState(project_name=PROJECT)
+    state.tasks = [
+        Task(id="v1-001", title="First", order=1, state=TaskState.READY),
+        Task(id="v1-002", title="Second", order=2, state=TaskState.READY),
+    ]
+    save_state(state)
+    return state
+
+
+def _journal(project_root):
+    return project_root / "state.log.ndjson"
+
+
+def test_save_task_roundtrips_through_load_state(state, project_root):
+    state_json = (project_root / "state.json").read_bytes()
+    task = state.tasks[0]
+    transition_task(task, TaskState.IN_PROGRESS)
+    save_task(state, task)
+
+    # Only the journal was written; state.json is the old checkpoint.
+    assert _journal(project_root).exists()
+    assert (project_root / "state.json").read_bytes() == state_json
+
+    loaded = load_state(PROJECT)
+    assert loaded.tasks[0].state == TaskState.IN_PROGRESS
+    assert loaded.tasks[1].state == TaskState.READY
+    assert loaded._journal_records == 1
+
+
+def test_journal_for_another_checkpoint_is_ignored(state, project_root):
+    task = state.tasks[0]
+    transition_task(task, TaskState.IN_PROGRESS)
+    save_task(state, task)
+
+    journal = _journal(project_root)
+    lines = journal.read_bytes().splitlines()
+    lines[0] = json.dumps({"checkpoint": [0, 0]}).encode()
+    journal.write_bytes(b"\n".join(lines) + b"\n")
+
+    loaded = load_state(PROJECT)
+    assert loaded.tasks[0].state == TaskState.READY
+    assert loaded._journal_records == 0
+
+
+def test_torn_trailing_record_forces_a_checkpoint(state, project_root):
+    task = state.tasks[0]
+    transition_task(task, TaskState.IN_PROGRESS)
+    save_task(state, task)
+    with open(_journal(project_root), "ab") as f:
+        f.write(b'{"id": "v1-002", "tit')
+
+    loaded = load_state(PROJECT)
+    assert loaded.tasks[0].state == TaskState.IN_PROGRESS
+    assert loaded.tasks[1].state == TaskState.READY
+    assert loaded._journal_records == JOURNAL_CHECKPOINT_INTERVAL
+
+    # The next save can't append after the torn line, so it checkpoints.
+    second = loaded.tasks[1]
+    transition_task(second, TaskState.IN_PROGRESS)
+    assert save_task(loaded, second) == project_root / "state.json"
+    assert not _journal(project_root).exists()
+
+    reloaded = load_state(PROJECT)
+    assert [t.state for t in reloaded.tasks] == [TaskState.IN_PROGRESS, TaskState.IN_PROGRESS]
+
+
+def test_skipped_state_write_keeps_a_valid_journal(state, project_root):
+    # A save_task that journals an unchanged task leaves the in-memory dump
+    # identical to state.json, so the next save_state skips the write and
+    # leaves the journal in place.
+    save_task(state, state.tasks[0])
+    state_json = (project_root / "state.json").read_bytes()
+    save_state(state)
+    assert (project_root / "state.json").read_bytes() == state_json
+    assert _journal(project_root).exists()
+
+    # Later records still append to it and replay on top of state.json.
+    task = state.tasks[1]
+    transition_task(task, TaskState.IN_PROGRESS)
+    save_task(state, task)
+    assert len(_journal(project_root).read_bytes().splitlines()) == 3
+
+    loaded = load_state(PROJECT)
+    assert loaded.tasks[0].state == TaskState.READY
+    assert loaded.tasks[1].state == TaskState.IN_PROGRESS
+    assert loaded._journal_records == 2
+
+
+def test_checkpoint_interval_rewrites_state_and_clears_journal(state, project_root):
+    task = state.tasks[0]
+    for _ in range(JOURNAL_CHECKPOINT_INTERVAL):
+        save_task(state, task)
+    assert _journal(project_root).exists()
+
+    transition_task(task, TaskState.IN_PROGRESS)
+    save_task(state, task)
+    assert not _journal(project_root).exists()
+    assert load_state(PROJECT).tasks[0].state == TaskState.IN_PROGRESS